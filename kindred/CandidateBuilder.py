@@ -1,6 +1,8 @@
 
-from collections import defaultdict
+from collections import defaultdict,Counter
 import itertools
+import array
+import numpy as np
 
 import kindred
 
@@ -10,15 +12,25 @@ class CandidateBuilder:
 	
 	:ivar entityCount: Number of entities in each relation (default=2)
 	:ivar acceptedEntityTypes: Tuples of entities that candidate relations must match. Each entity should be the same length as entityCount. None will match all candidate relations.
+	:ivar maxTokenDistance: Maximum number of tokens between the entities of a candidate relation (or None for no limit)
+	:ivar maxDependencyDistance: Maximum number of dependency edges between the entities of a candidate relation (or None for no limit)
+	:ivar symmetric: Whether the order of the entities doesn't matter, so each set of entities is only used for one candidate relation (with the entities in the order they are in the document) instead of one for every ordering
+	:ivar pruningCounts: Counts of the candidate relations (and those with known relations) that were checked against and removed by each distance limit
 	"""
-	def __init__(self,entityCount=2,acceptedEntityTypes=None):
+	def __init__(self,entityCount=2,acceptedEntityTypes=None,maxTokenDistance=None,maxDependencyDistance=None,symmetric=False):
 		"""
 		Constructor
 
 		:param entityCount: Number of entities in each relation (default=2)
 		:param acceptedEntityTypes: Tuples of entities that candidate relations must match. Each entity should be the same length as entityCount. None will match all candidate relations.
+		:param maxTokenDistance: Maximum distance (in tokens) between each pair of entities in a candidate relation, where adjacent tokens have a distance of 1. None will not limit it.
+		:param maxDependencyDistance: Maximum number of edges on the dependency path between each pair of entities in a candidate relation. Entities that aren't connected in the dependency graph are always too far apart. None will not limit it.
+		:param symmetric: Whether the relations are undirected (e.g. interactions). Each set of entities then gives one candidate relation with the entities in the order they are in the document, and it is labelled with the known relations between those entities in any order (with the argument names reordered to match the entities). Accepted entity types also match in any order.
 		:type entityCount: int
 		:type acceptedEntityTypes: list of tuples
+		:type maxTokenDistance: int
+		:type maxDependencyDistance: int
+		:type symmetric: bool
 		"""
 		assert isinstance(entityCount,int)
 		assert entityCount >= 2
@@ -33,6 +45,102 @@ class CandidateBuilder:
 				assert len(acceptedEntityType) == entityCount
 			self.acceptedEntityTypes = set(acceptedEntityTypes)
 
+		assert maxTokenDistance is None or (isinstance(maxTokenDistance,int) and maxTokenDistance >= 0), "maxTokenDistance must be None or a non-negative integer"
+		assert maxDependencyDistance is None or (isinstance(maxDependencyDistance,int) and maxDependencyDistance >= 0), "maxDependencyDistance must be None or a non-negative integer"
+		self.maxTokenDistance = maxTokenDistance
+		self.maxDependencyDistance = maxDependencyDistance
+		self.pruningCounts = Counter()
+
+		assert isinstance(symmetric,bool)
+		self.symmetric = symmetric
+
+	def _acceptedPermutations(self,entities):
+		# Only the permutations (of entity indices) that match one of the accepted entity type tuples are generated (instead of filtering all of them), in the same order as itertools.permutations
+		indicesByType = defaultdict(list)
+		for i,e in enumerate(entities):
+			indicesByType[e.entityType].append(i)
+
+		permutations = []
+		for acceptedEntityType in self.acceptedEntityTypes:
+			if not all( entityType in indicesByType for entityType in acceptedEntityType ):
+				continue
+			for indices in itertools.product(*[ indicesByType[entityType] for entityType in acceptedEntityType ]):
+				# The same entity can't be used twice when the tuple repeats a type
+				if len(set(indices)) == len(indices):
+					permutations.append(indices)
+
+		return sorted(permutations)
+
+	def _symmetricKnownTypesAndArgNames(self,entitiesInRelation,existingRelationsAndArgNames):
+		# The known relations between the entities in any order, with their argument names reordered to match the candidate's order of the entities
+		knownTypesAndArgNames = set()
+		for order in itertools.permutations(range(len(entitiesInRelation))):
+			entities = tuple( entitiesInRelation[i] for i in order )
+			if not entities in existingRelationsAndArgNames:
+				continue
+			for relationType,argNames in existingRelationsAndArgNames[entities]:
+				reorderedArgNames = [None] * len(argNames)
+				for argName,i in zip(argNames,order):
+					reorderedArgNames[i] = argName
+				knownTypesAndArgNames.add((relationType,tuple(reorderedArgNames)))
+		return list(knownTypesAndArgNames)
+
+	def _entityDistances(self,sentence):
+		# Distances between every pair of entities in the sentence (using the closest of their tokens)
+		entityTokenIndices = [ np.array(tokenIndices) for entity,tokenIndices in sentence.entityAnnotations ]
+		entityCount = len(entityTokenIndices)
+
+		tokenDistances = np.zeros((entityCount,entityCount))
+		if not self.maxTokenDistance is None:
+			for i,j in itertools.combinations(range(entityCount),2):
+				tokenDistances[i,j] = tokenDistances[j,i] = np.abs(np.subtract.outer(entityTokenIndices[i],entityTokenIndices[j])).min()
+
+		# Sentences that are too long for a dependency distance matrix aren't pruned by dependency distance
+		dependencyDistances = np.zeros((entityCount,entityCount))
+		tokenDependencyDistances = None if self.maxDependencyDistance is None else sentence.getDependencyDistances()
+		if not tokenDependencyDistances is None:
+			# Tokens that aren't connected are an infinite distance apart
+			tokenDependencyDistances = np.where(tokenDependencyDistances >= 0, tokenDependencyDistances, np.inf)
+			for i,j in itertools.combinations(range(entityCount),2):
+				dependencyDistances[i,j] = dependencyDistances[j,i] = tokenDependencyDistances[np.ix_(entityTokenIndices[i],entityTokenIndices[j])].min()
+
+		return tokenDistances,dependencyDistances
+
+	def _isWithinDistanceLimits(self,indices,tokenDistances,dependencyDistances,isKnownRelation):
+		pairs = list(itertools.combinations(indices,2))
+		exceededLimits = []
+		if not self.maxTokenDistance is None and max( tokenDistances[i,j] for i,j in pairs ) > self.maxTokenDistance:
+			exceededLimits.append('maxTokenDistance')
+		if not self.maxDependencyDistance is None and max( dependencyDistances[i,j] for i,j in pairs ) > self.maxDependencyDistance:
+			exceededLimits.append('maxDependencyDistance')
+		if len(exceededLimits) > 0:
+			exceededLimits.append('total')
+
+		self.pruningCounts['candidates'] += 1
+		if isKnownRelation:
+			self.pruningCounts['relations'] += 1
+		for limit in exceededLimits:
+			self.pruningCounts[limit] += 1
+			if isKnownRelation:
+				self.pruningCounts[limit + 'Relations'] += 1
+
+		return len(exceededLimits) == 0
+
+	def getPruningReport(self):
+		"""
+		Get how many candidate relations were removed by the distance limits (maxTokenDistance and maxDependencyDistance) in all the calls to build() and iterBuild() so far, and how many of them had known relations. On training data, the fraction of those relations that were removed is the recall lost by pruning. A candidate relation that breaks both limits is counted for both (and once in the total).
+
+		:return: Number of candidate relations and known relations that were checked, and for each limit (and in total) the number of candidate relations removed ('removed'), the number of known relations removed ('removedRelations') and the fraction of known relations removed ('recallLoss')
+		:rtype: dict
+		"""
+
+		report = {'candidates':self.pruningCounts['candidates'],'relations':self.pruningCounts['relations']}
+		for limit in ['maxTokenDistance','maxDependencyDistance','total']:
+			removedRelations = self.pruningCounts[limit + 'Relations']
+			recallLoss = removedRelations / float(report['relations']) if report['relations'] > 0 else 0.0
+			report[limit] = {'removed':self.pruningCounts[limit],'removedRelations':removedRelations,'recallLoss':recallLoss}
+		return report
+
 	def build(self,corpus):
 		"""
 		Creates the set of all possible relations that exist within the given corpus. Each relation will be contained within a single sentence.
@@ -43,9 +151,87 @@ class CandidateBuilder:
 		:rtype: List of kindred.Relation
 		"""
 		assert isinstance(corpus,kindred.Corpus)
-		assert corpus.parsed, "Corpus must have already been parsed"
+		assert all( doc.parsed for doc in corpus.documents ), "Corpus must have already been parsed"
+
+		return list(itertools.chain.from_iterable(self.iterBuild(corpus)))
+
+	def iterBuild(self,corpus,batchSize=None):
+		"""
+		Generates the same candidate relations as build() in batches so that they don't all need to be in memory at the same time.
+
+		:param corpus: Corpus of text with which to build relation candidates
+		:param batchSize: Number of candidate relations in each batch (the last may be smaller). None will give one batch for each sentence (that has candidates).
+		:type corpus: kindred.Corpus
+		:type batchSize: int
+		:return: Generator of lists of candidate relations matching entityCount and acceptedEntityTypes
+		:rtype: Generator of lists of kindred.CandidateRelation
+		"""
+		assert isinstance(corpus,kindred.Corpus)
+		assert all( doc.parsed for doc in corpus.documents ), "Corpus must have already been parsed"
+		assert batchSize is None or (isinstance(batchSize,int) and batchSize > 0), "batchSize must be None or a positive integer"
 
 		candidates = []
+		for sentence,sentenceCandidates in self._iterSentenceCandidates(corpus):
+			entitiesInSentence = [ entity for entity,tokenIndices in sentence.entityAnnotations ]
+			for indices,knownTypesAndArgNames in sentenceCandidates:
+				knownTypesAndArgNames = [ (relationType,list(argNames)) for relationType,argNames in knownTypesAndArgNames ]
+				candidateRelation = kindred.CandidateRelation(entities=[ entitiesInSentence[i] for i in indices ],knownTypesAndArgNames=knownTypesAndArgNames,sentence=sentence)
+				candidates.append(candidateRelation)
+
+				if len(candidates) == batchSize:
+					yield candidates
+					candidates = []
+
+			if batchSize is None and len(candidates) > 0:
+				yield candidates
+				candidates = []
+
+		if len(candidates) > 0:
+			yield candidates
+
+	def buildTable(self,corpus):
+		"""
+		Creates the same candidate relations as build() but stores them in a compact table of integers instead of as CandidateRelation objects.
+
+		:param corpus: Corpus of text with which to build relation candidates
+		:type corpus: kindred.Corpus
+		:return: Table of candidate relations matching entityCount and acceptedEntityTypes
+		:rtype: kindred.CandidateTable
+		"""
+		assert isinstance(corpus,kindred.Corpus)
+		assert all( doc.parsed for doc in corpus.documents ), "Corpus must have already been parsed"
+
+		sentences = []
+		sentenceIndices = array.array('i')
+		entityIndices = array.array('i')
+		labelKeys = []
+		labelKeyToBit = {}
+		labelledRows,labelledBits = [],[]
+		for sentence,sentenceCandidates in self._iterSentenceCandidates(corpus):
+			sentenceIndex = len(sentences)
+			sentences.append(sentence)
+			for indices,knownTypesAndArgNames in sentenceCandidates:
+				row = len(sentenceIndices)
+				sentenceIndices.append(sentenceIndex)
+				entityIndices.extend(indices)
+				for relationType,argNames in knownTypesAndArgNames:
+					labelKey = (relationType,) + argNames
+					if not labelKey in labelKeyToBit:
+						labelKeyToBit[labelKey] = len(labelKeys)
+						labelKeys.append(labelKey)
+					labelledRows.append(row)
+					labelledBits.append(labelKeyToBit[labelKey])
+
+		labels = np.zeros((len(sentenceIndices),len(labelKeys)), dtype=bool)
+		labels[labelledRows,labelledBits] = True
+
+		sentenceIndices = np.array(sentenceIndices, dtype=np.int32)
+		entityIndices = np.array(entityIndices, dtype=np.int32).reshape(-1,self.entityCount)
+
+		return kindred.CandidateTable(sentences,sentenceIndices,entityIndices,labelKeys,np.packbits(labels,axis=1))
+
+	def _iterSentenceCandidates(self,corpus):
+		# Generates the candidates for each sentence (with candidates) as the indices of their entities in sentence.entityAnnotations and their known relation types and argument names
 		for doc in corpus.documents:
 			existingRelationsAndArgNames = defaultdict(list)
 			for r in doc.relations:
@@ -56,17 +242,32 @@ class CandidateBuilder:
 			for sentence in doc.sentences:
 				entitiesInSentence = [ entity for entity,tokenIndices in sentence.entityAnnotations ]
 							
-				for entitiesInRelation in itertools.permutations(entitiesInSentence, self.entityCount):
-					typesInRelation = tuple([ e.entityType for e in entitiesInRelation ])
-					if not self.acceptedEntityTypes is None and not typesInRelation in self.acceptedEntityTypes:
-						# Relation doesn't contain the right entity types (so skip it)
-						continue
+				if self.acceptedEntityTypes is None and self.symmetric:
+					entityPermutations = itertools.combinations(range(len(entitiesInSentence)), self.entityCount)
+				elif self.acceptedEntityTypes is None:
+					entityPermutations = itertools.permutations(range(len(entitiesInSentence)), self.entityCount)
+				elif self.symmetric:
+					# Each set of entities that matches an accepted entity type tuple in some order, with the entities in sentence order
+					entityPermutations = sorted(set( tuple(sorted(indices)) for indices in self._acceptedPermutations(entitiesInSentence) ))
+				else:
+					entityPermutations = self._acceptedPermutations(entitiesInSentence)
 
-					knownTypesAndArgNames = list(set(existingRelationsAndArgNames[entitiesInRelation]))
-					knownTypesAndArgNames = [ (relationType,list(argNames)) for relationType,argNames in knownTypesAndArgNames ]
-				
-					candidateRelation = kindred.CandidateRelation(entities=list(entitiesInRelation),knownTypesAndArgNames=knownTypesAndArgNames,sentence=sentence)
-					candidates.append(candidateRelation)
+				usesDistanceLimits = not (self.maxTokenDistance is None and self.maxDependencyDistance is None)
+				if usesDistanceLimits and len(entitiesInSentence) >= self.entityCount:
+					tokenDistances,dependencyDistances = self._entityDistances(sentence)
+
+				sentenceCandidates = []
+				for indices in entityPermutations:
+					entitiesInRelation = tuple( entitiesInSentence[i] for i in indices )
+					if self.symmetric:
+						knownTypesAndArgNames = self._symmetricKnownTypesAndArgNames(entitiesInRelation,existingRelationsAndArgNames)
+					else:
+						knownTypesAndArgNames = list(set(existingRelationsAndArgNames[entitiesInRelation]))
 
-		return candidates
+					if usesDistanceLimits and not self._isWithinDistanceLimits(indices,tokenDistances,dependencyDistances,len(knownTypesAndArgNames) > 0):
+						continue
+				
+					sentenceCandidates.append((indices,knownTypesAndArgNames))
 
+				if len(sentenceCandidates) > 0:
+					yield sentence,sentenceCandidates
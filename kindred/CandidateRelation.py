@@ -9,7 +9,11 @@ class CandidateRelation:
 	:ivar entities: List of entities in relation
 	:ivar knownTypesAndArgNames: List of tuples with known relation types and argument names associated with this candidate relation
 	:ivar sentence: Parsed sentence containing the candidate relation
+
+	The hash of a candidate relation is cached (and reset when entities, knownTypesAndArgNames or sentence is set), so the entities and knownTypesAndArgNames lists should be replaced rather than modified in place.
 	"""
+
+	__slots__ = ['_entities','_knownTypesAndArgNames','_sentence','_hash']
 	
 	def __init__(self,entities=None,knownTypesAndArgNames=None,sentence=None):
 		"""
@@ -31,7 +35,7 @@ class CandidateRelation:
 		assert isinstance(entities,list),  "entities must be a list of kindred.Entity"
 		for entity in entities:
 			assert isinstance(entity, kindred.Entity), "entities must be a list of kindred.Entity"
-		self.entities = entities
+		self._entities = entities
 
 		knownTypesAndArgNamesError = "knownTypesAndArgNames must be a list of tuples where each (length=2) tuple is the name of the relation and a list of argument names"
 		assert isinstance(knownTypesAndArgNames,list), knownTypesAndArgNamesError
@@ -43,15 +47,60 @@ class CandidateRelation:
 			assert isinstance(knownArgNames,list), knownTypesAndArgNamesError
 			for knownArgName in knownArgNames:
 				assert isinstance(knownArgName, six.string_types), knownTypesAndArgNamesError
-		self.knownTypesAndArgNames = knownTypesAndArgNames
+		self._knownTypesAndArgNames = knownTypesAndArgNames
 				
 		assert sentence is None or isinstance(sentence, kindred.Sentence)
-		self.sentence = sentence
+		self._sentence = sentence
+		self._hash = None
+
+	# The attributes used by the hash are properties so that setting one resets the cached hash
+	@property
+	def entities(self):
+		return self._entities
+
+	@entities.setter
+	def entities(self, entities):
+		self._entities = entities
+		self._hash = None
+
+	@property
+	def knownTypesAndArgNames(self):
+		return self._knownTypesAndArgNames
+
+	@knownTypesAndArgNames.setter
+	def knownTypesAndArgNames(self, knownTypesAndArgNames):
+		self._knownTypesAndArgNames = knownTypesAndArgNames
+		self._hash = None
+
+	@property
+	def sentence(self):
+		return self._sentence
+
+	@sentence.setter
+	def sentence(self, sentence):
+		self._sentence = sentence
+		self._hash = None
 	
+	_valueAttributes = ['entities','knownTypesAndArgNames','sentence']
+
+	def __getstate__(self):
+		# The cached hash isn't pickled as it can depend on object identities
+		return { a:getattr(self,a) for a in CandidateRelation._valueAttributes }
+
+	def __setstate__(self, state):
+		# Older versions pickled the attributes without underscores (e.g. entities rather than _entities) which also go through the properties here
+		self._hash = None
+		for name,value in state.items():
+			setattr(self, name, value)
+
 	def __eq__(self, other):
 		"""Override the default Equals behavior"""
+		if self is other:
+			return True
 		if isinstance(other, self.__class__):
-			return self.__dict__ == other.__dict__
+			if hash(self) != hash(other):
+				return False
+			return all( getattr(self,a) == getattr(other,a) for a in CandidateRelation._valueAttributes )
 		return False
 	
 	def __ne__(self, other):
@@ -65,7 +114,9 @@ class CandidateRelation:
 		return self.__str__()
 
 	def __hash__(self):
-		knownTypesAndArgNamesToTuple = tuple([ (knownType,tuple(knownArgNames)) for knownType,knownArgNames in self.knownTypesAndArgNames ])
+		if self._hash is None:
+			knownTypesAndArgNamesToTuple = tuple([ (knownType,tuple(knownArgNames)) for knownType,knownArgNames in self.knownTypesAndArgNames ])
 
-		return hash((tuple(self.entities),knownTypesAndArgNamesToTuple,self.sentence))
+			self._hash = hash((tuple(self.entities),knownTypesAndArgNamesToTuple,self.sentence))
+		return self._hash
 
@@ -0,0 +1,73 @@
+import kindred
+import numpy as np
+
+class CandidateTable:
+	"""
+	Compact table of candidate relations (e.g. from :meth:`kindred.CandidateBuilder.buildTable`). Each candidate relation is a row of integers (the index of its sentence, the indices of its entities in that sentence's entityAnnotations and a bitset of its known relation types and argument names) instead of a :class:`kindred.CandidateRelation` object. The candidate relations are only created when they are used (e.g. by iterating over the table).
+
+	:ivar sentences: List of the sentences that contain the candidate relations
+	:ivar sentenceIndices: Array of the index (in sentences) of the sentence of each candidate relation
+	:ivar entityIndices: Array (# candidate relations by entity count) of the indices (in the sentence's entityAnnotations) of the entities of each candidate relation
+	:ivar labelKeys: List of the known relation types and argument names (as tuples of the relation type followed by the argument names) that the label bits refer to
+	:ivar labels: Array (# candidate relations by # bytes) of the bits (packed with numpy.packbits) for the known relation types and argument names of each candidate relation
+	"""
+
+	def __init__(self,sentences,sentenceIndices,entityIndices,labelKeys,labels):
+		"""
+		Constructor for the CandidateTable class
+
+		:param sentences: List of the sentences that contain the candidate relations
+		:param sentenceIndices: Index (in sentences) of the sentence of each candidate relation
+		:param entityIndices: Indices (in the sentence's entityAnnotations) of the entities of each candidate relation
+		:param labelKeys: Known relation types and argument names (as tuples of the relation type followed by the argument names) that the label bits refer to
+		:param labels: Bits (packed with numpy.packbits along each row) for the known relation types and argument names of each candidate relation
+		:type sentences: list of kindred.Sentence
+		:type sentenceIndices: numpy.ndarray
+		:type entityIndices: numpy.ndarray
+		:type labelKeys: list of tuples
+		:type labels: numpy.ndarray
+		"""
+
+		assert isinstance(sentences,list)
+		for sentence in sentences:
+			assert isinstance(sentence,kindred.Sentence)
+		assert isinstance(labelKeys,list)
+		for labelKey in labelKeys:
+			assert isinstance(labelKey,tuple)
+
+		self.sentences = sentences
+		self.sentenceIndices = np.asarray(sentenceIndices, dtype=np.int32)
+		self.entityIndices = np.asarray(entityIndices, dtype=np.int32)
+		self.labelKeys = labelKeys
+		self.labels = np.asarray(labels, dtype=np.uint8)
+
+		assert len(self.entityIndices.shape) == 2 and self.entityIndices.shape[0] == len(self.sentenceIndices), "entityIndices must have a row for each candidate relation"
+		assert self.labels.shape == (len(self.sentenceIndices),(len(labelKeys)+7)//8), "labels must have a packed row of bits for each candidate relation"
+
+	@property
+	def entityCount(self):
+		return self.entityIndices.shape[1]
+
+	def getLabelMatrix(self):
+		"""
+		Get the known relation types and argument names of each candidate relation as a matrix
+
+		:return: Matrix (# candidate relations by # labelKeys) with a 1 where a candidate relation has a known relation type and argument names
+		:rtype: numpy.ndarray
+		"""
+
+		return np.unpackbits(self.labels,axis=1,count=len(self.labelKeys))
+
+	def __len__(self):
+		return len(self.sentenceIndices)
+
+	def __getitem__(self,i):
+		sentence = self.sentences[self.sentenceIndices[i]]
+		entities = [ sentence.entityAnnotations[j][0] for j in self.entityIndices[i].tolist() ]
+		labelBits = np.flatnonzero(np.unpackbits(self.labels[i],count=len(self.labelKeys))).tolist()
+		knownTypesAndArgNames = [ (self.labelKeys[b][0],list(self.labelKeys[b][1:])) for b in labelBits ]
+		return kindred.CandidateRelation(entities=entities,knownTypesAndArgNames=knownTypesAndArgNames,sentence=sentence)
+
+	def __iter__(self):
+		for i in range(len(self)):
+			yield self[i]
@@ -6,7 +6,8 @@ class Corpus:
 	Collection of text documents.
 
 	:ivar documents: List of :class:`kindred.Document`
-	:ivar parsed: Boolean of whether it has been parsed yet. A :class:`kindred.parser` can parse it.
+	:ivar parsed: Boolean of whether it has documents and all of them have been parsed yet. A :class:`kindred.parser` can parse it. Setting it sets the parse state of every document.
+	:ivar vocabulary: Vocabulary (:class:`kindred.Vocabulary`) that the parser interns the words, lemmas, parts-of-speech and dependency types of the corpus in
 	"""
 	
 	def __init__(self,text=None,loadFromSimpleTag=False):
@@ -20,11 +21,35 @@ class Corpus:
 		"""
 
 		self.documents = []
+		self.vocabulary = kindred.Vocabulary()
 		if not text is None:
 			doc = kindred.Document(text,loadFromSimpleTag=loadFromSimpleTag)
 			self.addDocument(doc)
 
-		self.parsed = False
+	@property
+	def parsed(self):
+		# An empty corpus hasn't been parsed
+		return len(self.documents) > 0 and all( doc.parsed for doc in self.documents )
+
+	@parsed.setter
+	def parsed(self,parsed):
+		for doc in self.documents:
+			doc.parsed = parsed
+
+	def __getstate__(self):
+		# Each sentence pickles the strings that it uses, so the vocabulary is rebuilt from them when unpickling (without any unused strings)
+		state = dict(self.__dict__)
+		del state['vocabulary']
+		return state
+
+	def __setstate__(self,state):
+		# Corpora pickled by older versions also stored the parse state (now taken from the documents)
+		self.__dict__.update(state)
+		self.__dict__.pop('parsed',None)
+		self.vocabulary = kindred.Vocabulary()
+		for doc in self.documents:
+			for sentence in doc.sentences:
+				sentence._useVocabulary(self.vocabulary)
 
 	def addDocument(self,doc):
 		"""
@@ -94,6 +119,7 @@ class Corpus:
 		trainIndices = set(trainIndices)
 
 		trainCorpus,testCorpus = kindred.Corpus(),kindred.Corpus()
+		trainCorpus.vocabulary = testCorpus.vocabulary = self.vocabulary
 		for i,doc in enumerate(self.documents):
 			if i in trainIndices:
 				trainCorpus.addDocument(doc)
@@ -122,6 +148,7 @@ class Corpus:
 
 		for f in range(folds):
 			trainCorpus,testCorpus = kindred.Corpus(),kindred.Corpus()
+			trainCorpus.vocabulary = testCorpus.vocabulary = self.vocabulary
 			for i,indexChunk in enumerate(indexChunks):
 				for j in indexChunk:
 					if i==f:
@@ -140,10 +167,10 @@ class Corpus:
 		assert self.parsed == True, "Corpus must be parsed before it can be split into sentences"
 
 		sentenceCorpus = kindred.Corpus()
+		sentenceCorpus.vocabulary = self.vocabulary
 		for doc in self.documents:
 			tempCorpus = doc.splitIntoSentences()
 			sentenceCorpus.documents += tempCorpus.documents
-		sentenceCorpus.parsed = True
 
 		return sentenceCorpus
 
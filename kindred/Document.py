@@ -1,4 +1,5 @@
 import kindred
+import numpy as np
 from collections import OrderedDict
 
 class Document:
@@ -11,6 +12,8 @@ class Document:
 	:ivar sourceFilename: Filename that this document came from
 	:ivar metadata: IDs and other information associated with the source (e.g. PMID)
 	:ivar sentences: List of sentences (:class:`kindred.Sentence`) if the document has been parsed
+	:ivar parsed: Whether the document has been parsed yet. A :class:`kindred.Parser` only parses documents that haven't been parsed (or were parsed without the annotations that it provides)
+	:ivar parsedAnnotations: Annotations beyond tokens and sentences that the parse of the document provides (a subset of 'lemmas', 'partsofspeech' and 'dependencies'). None if the document was parsed without recording them, in which case the parse is treated as having all of them
 	"""
 	
 	def __init__(self,text,entities=None,relations=None,sourceFilename=None,metadata=None,loadFromSimpleTag=False):
@@ -66,6 +69,8 @@ class Document:
 				self.relations = relations
 
 		self.sentences = []
+		self.parsed = False
+		self.parsedAnnotations = None
 		
 	def __repr__(self):
 		"""
@@ -98,7 +103,10 @@ class Document:
 
 		if self.sentences:
 			for sentence in self.sentences:
-				overlappingTokens = [ i for i,t in enumerate(sentence.tokens) if any (not (t.endPos <= eStart or t.startPos >= eEnd) for eStart,eEnd in entity.position ) ]
+				overlapping = np.zeros(len(sentence.wordIDs),dtype=bool)
+				for eStart,eEnd in entity.position:
+					overlapping |= (sentence.endPositions > eStart) & (sentence.startPositions < eEnd)
+				overlappingTokens = np.flatnonzero(overlapping).tolist()
 				if overlappingTokens:
 					sentence.addEntityAnnotation(entity,overlappingTokens)
 
@@ -123,6 +131,30 @@ class Document:
 		assert isinstance(sentence,kindred.Sentence)
 		self.sentences.append(sentence)
 		
+	def __setstate__(self,state):
+		# Documents pickled before the parse state was tracked per document count as parsed if they have sentences
+		self.__dict__.update(state)
+		if not 'parsed' in state:
+			self.parsed = len(self.sentences) > 0
+		if not 'parsedAnnotations' in state:
+			self.parsedAnnotations = None
+
+	def hasParsedAnnotations(self,annotations):
+		"""
+		Check whether the document has been parsed with all the given annotations
+		
+		:param annotations: Annotations beyond tokens and sentences (a subset of 'lemmas', 'partsofspeech' and 'dependencies')
+		:type annotations: list of str
+		:return: Whether the document is parsed and its parse provides the annotations
+		:rtype: bool
+		"""
+
+		if not self.parsed:
+			return False
+		elif self.parsedAnnotations is None:
+			return True
+		return all( annotation in self.parsedAnnotations for annotation in annotations )
+		
 	def clone(self):
 		"""
 		Clones the document
@@ -157,7 +189,7 @@ class Document:
 		sentenceCorpus = kindred.Corpus()
 		
 		for sentence in self.sentences:
-			sentenceStart = sentence.tokens[0].startPos
+			sentenceStart = int(sentence.startPositions[0])
 			
 			entitiesInSentence = [ entity for entity,tokenIndices in sentence.entityAnnotations ]
 
@@ -178,12 +210,12 @@ class Document:
 			newEntitiesInSentence = list(entityMap.values())
 			doc = kindred.Document(sentence.text.rstrip('\n'),newEntitiesInSentence,newRelationsInSentence)
 
-			newTokens = [ kindred.Token(t.word,t.lemma,t.partofspeech,t.startPos-sentenceStart,t.endPos-sentenceStart) for t in sentence.tokens ]
-
-			newSentence = kindred.Sentence(sentence.text,newTokens,sentence.dependencies,sentence.sourceFilename)
+			newSentence = kindred.Sentence.fromColumns(sentence.text,sentence.vocabulary,sentence.wordIDs,sentence.lemmaIDs,sentence.partofspeechIDs,sentence.startPositions-sentenceStart,sentence.endPositions-sentenceStart,sentence.dependencySources,sentence.dependencyTargets,sentence.dependencyTypeIDs,sentence.sourceFilename)
 			newEntityAnnotations = [ (entityMap[e],tokenIndices) for e,tokenIndices in sentence.entityAnnotations ]
 			newSentence.entityAnnotations = newEntityAnnotations
 			doc.sentences = [newSentence]
+			doc.parsed = True
+			doc.parsedAnnotations = self.parsedAnnotations
 
 			if len(doc.text.strip()) > 0:
 				sentenceCorpus.addDocument(doc)
@@ -1,4 +1,7 @@
 import six
+import os
+import random
+import itertools
 
 class Entity:
 	"""
@@ -10,9 +13,15 @@ class Entity:
 	:ivar sourceEntityID: Entity ID used in source document
 	:ivar externalID: ID associated with external ontology (e.g. Hugo Gene ID)
 	:ivar metadata: Additional metadata about the the entity
+	:ivar entityID: Internal ID that is unique to this entity (including across processes). Equality and hashing only use it so entities are cheap to use as dictionary keys
 	"""
+
+	__slots__ = ['entityType','sourceEntityID','externalID','text','position','metadata','entityID']
 	
-	_nextInternalID = 1
+	# Internal IDs are a random per-process namespace (in the upper bits) combined with a counter, so that entities created in different processes (e.g. workers in a pool) don't share IDs
+	_idNamespace = None
+	_idCounter = None
+	_idsPerNamespace = 2**32
 
 	def __init__(self,entityType,text,position,sourceEntityID=None,externalID=None,metadata=None):
 		"""
@@ -56,8 +65,9 @@ class Entity:
 		self.position = position
 		self.metadata = metadata
 		
-		self.entityID = Entity._nextInternalID
-		Entity._nextInternalID += 1
+		self.entityID = Entity._idNamespace | next(Entity._idCounter)
+		if self.entityID & (Entity._idsPerNamespace-1) == Entity._idsPerNamespace-1:
+			_newIDNamespace()
 		
 	def __str__(self):
 		if self.externalID is None:
@@ -70,9 +80,11 @@ class Entity:
 		return self.__str__()
 		
 	def __eq__(self, other):
-		"""Override the default Equals behavior"""
+		"""Entities are equal if they have the same internal ID (i.e. they are the same entity or a pickled copy of it). Use valueEquals to compare the entity information instead"""
+		if self is other:
+			return True
 		if isinstance(other, self.__class__):
-			return self.__dict__ == other.__dict__
+			return self.entityID == other.entityID
 		return False
 	
 	def __ne__(self, other):
@@ -80,7 +92,28 @@ class Entity:
 		return not self.__eq__(other)
 
 	def __hash__(self):
-		return hash((self.entityType,self.text,tuple(self.position),self.sourceEntityID,self.externalID))
+		return hash(self.entityID)
+
+	def __setstate__(self, state):
+		# Entities pickled before __slots__ was used have their attributes in a dictionary rather than a (dictionary,slots) tuple
+		if isinstance(state, tuple):
+			state = state[1]
+		for name,value in state.items():
+			setattr(self, name, value)
+
+	def valueEquals(self, other):
+		"""
+		Check whether another entity has the same type, text, position, IDs and metadata (ignoring the internal entity ID)
+
+		:param other: Entity to compare to
+		:type other: kindred.Entity
+		:return: Whether the entities have the same values
+		:rtype: bool
+		"""
+
+		if not isinstance(other, self.__class__):
+			return False
+		return all( getattr(self,a) == getattr(other,a) for a in self.__slots__ if a != 'entityID' )
 
 	def clone(self):
 		"""
@@ -93,3 +126,13 @@ class Entity:
 		cloned = Entity(self.entityType,self.text,list(self.position),self.sourceEntityID,self.externalID,dict(self.metadata))
 		return cloned
 
+def _newIDNamespace():
+	# SystemRandom is used so that seeding the random module (e.g. identically in each worker) can't make namespaces collide
+	Entity._idNamespace = random.SystemRandom().getrandbits(32) * Entity._idsPerNamespace
+	Entity._idCounter = itertools.count(1)
+
+_newIDNamespace()
+
+# A forked child process would otherwise continue with the same IDs as its parent
+if hasattr(os, 'register_at_fork'):
+	os.register_at_fork(after_in_child=_newIDNamespace)
@@ -146,20 +146,22 @@ def getTermIDsAndLocations(sentence, lookupDict):
 	# Lowercase all the tokens
 	#np = [ unicodeLower(w) for w in np ]
 	#orignp = np
-	np = [ t.word.lower() for t in sentence.tokens ]
+	np = [ w.lower() for w in sentence.vocabulary.getStrings(sentence.wordIDs) ]
 	blank = "".join( " " for _ in sentence.text )
 
 	tempSentence = sentence.text.lower()
-	sentenceStart = sentence.tokens[0].startPos
+	tokenStarts = sentence.startPositions.tolist()
+	tokenEnds = sentence.endPositions.tolist()
+	sentenceStart = tokenStarts[0]
 	# The length of each search string will decrease from the full length
 	# of the text down to 1
-	for l in reversed(range(1, len(sentence.tokens)+1)):
+	for l in reversed(range(1, len(np)+1)):
 		# We move the search window through the text
 		for i in range(len(np)-l+1):
 			# Extract that window of text
 			#s = tuple(np[i:i+l])
-			startPos = sentence.tokens[i].startPos - sentenceStart
-			endPos = sentence.tokens[i+l-1].endPos - sentenceStart
+			startPos = tokenStarts[i] - sentenceStart
+			endPos = tokenEnds[i+l-1] - sentenceStart
 			s = tempSentence[startPos:endPos]
 
 			# Search for it in the dictionary
@@ -265,11 +267,11 @@ class EntityRecognizer:
 	def _processWords(self, sentence):
 		locs,terms,termtypesAndids = getTermIDsAndLocations(sentence,self.lookup)
 
-		words = [ t.word for t in sentence.tokens ]
+		words = sentence.vocabulary.getStrings(sentence.wordIDs)
 
 		# Index the start and ends locations of tokens for lookup
-		token_starts = { t.startPos:i for i,t in enumerate(sentence.tokens) }
-		token_ends = { t.endPos:i for i,t in enumerate(sentence.tokens) }
+		token_starts = { startPos:i for i,startPos in enumerate(sentence.startPositions.tolist()) }
+		token_ends = { endPos:i for i,endPos in enumerate(sentence.endPositions.tolist()) }
 		
 		if self.detectVariants:
 			snvMatches = list(self.variantRegex1.finditer(sentence.text)) + list(self.variantRegex2.finditer(sentence.text))
@@ -461,7 +463,7 @@ class EntityRecognizer:
 		:type corpus: kindred.Corpus
 		"""
 
-		assert corpus.parsed == True, "Corpus must already be parsed before entity recognition"
+		assert all( doc.parsed for doc in corpus.documents ), "Corpus must already be parsed before entity recognition"
 
 		for doc in corpus.documents:
 			entityCount = len(doc.entities)
@@ -472,8 +474,8 @@ class EntityRecognizer:
 				for locs,terms,termtypesAndids in extractedTermData:
 					startToken = locs[0]
 					endToken = locs[1]
-					startPos = sentence.tokens[startToken].startPos
-					endPos = sentence.tokens[endToken-1].endPos
+					startPos = int(sentence.startPositions[startToken])
+					endPos = int(sentence.endPositions[endToken-1])
 					text = doc.text[startPos:endPos]
 					loc = list(range(startToken,endToken))
 					for entityType,externalID in termtypesAndids:
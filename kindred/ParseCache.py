@@ -0,0 +1,175 @@
+import os
+import gzip
+import json
+import hashlib
+import tempfile
+
+class ParseCache:
+	"""
+	On-disk cache of parsed documents. Each entry is keyed by a hash of the document text and the parser configuration (e.g. Spacy model name and version) and stores the tokens, lemmas, parts-of-speech, offsets and dependencies of every sentence. The least recently used entries are removed when the cache grows beyond its maximum size.
+
+	:ivar directory: Directory that the cache entries are stored in
+	:ivar maxSize: Maximum total size (in bytes) of the cache entries
+	:ivar size: Current total size (in bytes) of the cache entries
+	:ivar hits: Number of lookups that were found in the cache
+	:ivar misses: Number of lookups that were not found in the cache
+	"""
+
+	def __init__(self,directory,maxSize=1024**3):
+		"""
+		Constructor for a cache that will be stored in the given directory (which is created if needed)
+
+		:param directory: Directory to store the cache entries in
+		:param maxSize: Maximum total size (in bytes) of the cache entries
+		:type directory: str
+		:type maxSize: int
+		"""
+
+		assert isinstance(maxSize,int) and maxSize > 0, "maxSize must be a positive integer"
+
+		if not os.path.isdir(directory):
+			os.makedirs(directory)
+
+		self.directory = directory
+		self.maxSize = maxSize
+		self._size = None
+		self.hits = 0
+		self.misses = 0
+
+	@property
+	def size(self):
+		# The cache directory is only walked to find its size when it is first needed (e.g. when an entry is stored), so opening a large cache to read from it is cheap
+		if self._size is None:
+			self._size = sum( size for _,size,_ in self._entries() )
+		return self._size
+
+	@size.setter
+	def size(self,size):
+		self._size = size
+
+	def _entries(self):
+		entries = []
+		for root,dirs,files in os.walk(self.directory):
+			for f in files:
+				if not f.endswith('.json.gz'):
+					continue
+				path = os.path.join(root,f)
+				try:
+					stat = os.stat(path)
+				except OSError:
+					# Removed by another process sharing the cache
+					continue
+				entries.append((stat.st_mtime,stat.st_size,path))
+		return entries
+
+	def _path(self,key):
+		return os.path.join(self.directory,key[:2],'%s.json.gz' % key)
+
+	def getKey(self,text,configuration):
+		"""
+		Get the key for a document text parsed with a specific parser configuration
+
+		:param text: Text of the document
+		:param configuration: Description of the parser configuration (e.g. model name and version)
+		:type text: str
+		:type configuration: str
+		:return: Hex digest used to store the parse
+		:rtype: str
+		"""
+
+		h = hashlib.sha256()
+		h.update(configuration.encode('utf8'))
+		h.update(b'\0')
+		h.update(text.encode('utf8'))
+		return h.hexdigest()
+
+	def __contains__(self,key):
+		return os.path.isfile(self._path(key))
+
+	def get(self,key):
+		"""
+		Get the compact sentence information stored for a key
+
+		:param key: Key from getKey
+		:type key: str
+		:return: List of sentence information (or None if the key isn't in the cache)
+		:rtype: list
+		"""
+
+		path = self._path(key)
+		try:
+			with gzip.open(path,'rt',encoding='utf8') as f:
+				sentences = json.load(f)
+			# Mark the entry as recently used
+			os.utime(path,None)
+		except (OSError,ValueError):
+			self.misses += 1
+			return None
+
+		self.hits += 1
+		return sentences
+
+	def set(self,key,sentences):
+		"""
+		Store the compact sentence information for a key, evicting old entries if the cache becomes too large
+
+		:param key: Key from getKey
+		:param sentences: List of sentence information
+		:type key: str
+		:type sentences: list
+		"""
+
+		path = self._path(key)
+		subdirectory = os.path.dirname(path)
+		if not os.path.isdir(subdirectory):
+			os.makedirs(subdirectory,exist_ok=True)
+
+		# An existing entry for the key is replaced so its size no longer counts
+		try:
+			oldSize = os.path.getsize(path)
+		except OSError:
+			oldSize = 0
+
+		# Write to a temporary file first so that other processes never see a partial entry
+		fd,tempPath = tempfile.mkstemp(dir=subdirectory,suffix='.tmp')
+		try:
+			with os.fdopen(fd,'wb') as rawFile:
+				with gzip.open(rawFile,'wt',encoding='utf8') as f:
+					json.dump(sentences,f)
+			os.replace(tempPath,path)
+		finally:
+			if os.path.exists(tempPath):
+				os.remove(tempPath)
+
+		# If the size isn't known yet, finding it now includes the new entry
+		if self._size is not None:
+			self._size += os.path.getsize(path) - oldSize
+		if self.size > self.maxSize:
+			self._evict()
+
+	def _evict(self):
+		entries = sorted(self._entries())
+		self.size = sum( size for _,size,_ in entries )
+
+		# Evict down to 90% of the limit so that a full cache isn't rescanned on every write
+		targetSize = int(0.9*self.maxSize)
+		for _,size,path in entries:
+			if self.size <= targetSize:
+				break
+			try:
+				os.remove(path)
+			except OSError:
+				pass
+			self.size -= size
+
+	def clear(self):
+		"""
+		Remove all entries from the cache
+		"""
+
+		for _,_,path in self._entries():
+			try:
+				os.remove(path)
+			except OSError:
+				pass
+		self.size = 0
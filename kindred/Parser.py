@@ -2,50 +2,477 @@
 
 
 import kindred
-from intervaltree import IntervalTree
-from collections import defaultdict
+from kindred.ParseCache import ParseCache
+from kindred.parseFunctions import addCompactSentencesToDocument
+from collections import OrderedDict
+import multiprocessing
+import os
 import six
+from six.moves import queue
+
+def _getModelLanguage(model):
+	# Find the language of a Spacy model (given as a package name, a path or a language code) from its meta data without loading its pipeline
+	import spacy
+
+	meta = {}
+	if spacy.util.is_package(model):
+		meta = _readModelMeta(spacy.util.get_package_path(model))
+	elif os.path.isdir(model):
+		meta = _readModelMeta(model)
+	else:
+		try:
+			spacy.util.get_lang_class(model)
+			return model
+		except ImportError:
+			pass
+
+	if 'lang' in meta:
+		return meta['lang']
+
+	# Fall back to loading the model if it has no meta data
+	return spacy.load(model).lang
+
+def _readModelMeta(path):
+	import spacy
+	try:
+		return spacy.util.get_model_meta(path)
+	except (IOError,ValueError):
+		return {}
+
+def _loadModel(model,annotations,backend='spacy'):
+	# We only load spacy if a Parser is created (to allow ReadTheDocs to build the documentation easily)
+	import spacy
+
+	key = (model,tuple(annotations),backend)
+	if key in Parser._models:
+		return Parser._models[key]
+
+	if backend == 'rules':
+		# Only Spacy's rule-based tokenizer and punctuation-based sentencizer for the language of the model (e.g. en for en_core_web_sm)
+		nlp = spacy.blank(_getModelLanguage(model))
+		nlp.add_pipe('sentencizer')
+		Parser._models[key] = nlp
+		return nlp
+
+	disable = ['ner']
+	if not 'dependencies' in annotations:
+		disable.append('parser')
+	if not 'lemmas' in annotations:
+		disable.append('lemmatizer')
+	if not 'lemmas' in annotations and not 'partsofspeech' in annotations:
+		disable += ['tagger','morphologizer','attribute_ruler']
+
+	nlp = spacy.load(model, disable=disable)
+
+	# Without the dependency parser, sentence boundaries come from the (cheaper) sentence recognizer
+	if not 'parser' in nlp.pipe_names and not 'senter' in nlp.pipe_names:
+		if 'senter' in nlp.disabled:
+			nlp.enable_pipe('senter')
+		else:
+			nlp.add_pipe('sentencizer')
+
+	# The shared token-to-vector layer is only needed if a remaining component listens to it
+	if 'tok2vec' in nlp.pipe_names:
+		listeners = nlp.get_pipe('tok2vec').listening_components
+		if not any( name in nlp.pipe_names for name in listeners ):
+			nlp.disable_pipe('tok2vec')
+
+	Parser._models[key] = nlp
+	return nlp
+
+def _compactSentences(parsed):
+	# Reduce a Spacy document to plain lists (one tuple per sentence) which are cheap to pickle between processes
+	sentences = []
+	for sent in parsed.sents:
+		indexOffset = sent[0].i
+		words = [ t.text for t in sent ]
+		lemmas = [ t.lemma_ for t in sent ]
+		partsofspeech = [ t.pos_ for t in sent ]
+		startPositions = [ t.idx for t in sent ]
+		endPositions = [ t.idx+len(t.text) for t in sent ]
+		if parsed.has_annotation("DEP"):
+			heads = [ t.head.i-indexOffset for t in sent ]
+			dependencyTypes = [ t.dep_ for t in sent ]
+		else:
+			heads,dependencyTypes = [],[]
+		sentences.append((words,lemmas,partsofspeech,startPositions,endPositions,heads,dependencyTypes))
+	return sentences
+
+def _offsetCompactSentences(sentences,offset):
+	# Move the token positions of compact sentences from chunk coordinates into document coordinates
+	if offset == 0:
+		return sentences
+	offsetSentences = []
+	for words,lemmas,partsofspeech,startPositions,endPositions,heads,dependencyTypes in sentences:
+		startPositions = [ p+offset for p in startPositions ]
+		endPositions = [ p+offset for p in endPositions ]
+		offsetSentences.append((words,lemmas,partsofspeech,startPositions,endPositions,heads,dependencyTypes))
+	return offsetSentences
+
+def _splitLongText(text,maxChunkLength):
+	# Break a single long paragraph, preferably after a sentence-ending full stop and otherwise at whitespace
+	pieces = []
+	start = 0
+	while len(text) - start > maxChunkLength:
+		window = text[start:start+maxChunkLength]
+
+		# Keep the whitespace at the end of the earlier piece so that it doesn't become a token of its own
+		cut = window.rfind('. ') + 2
+		if cut < 2:
+			cut = max(window.rfind(' '),window.rfind('\t')) + 1
+		if cut < 1:
+			cut = maxChunkLength
+		pieces.append(text[start:start+cut])
+		start += cut
+	pieces.append(text[start:])
+	return pieces
+
+def _splitIntoChunks(text,maxChunkLength):
+	# Split text into (offset,chunk) pieces no longer than maxChunkLength. Chunks are made of whole lines (e.g. paragraphs or passages) where possible
+	if len(text) <= maxChunkLength:
+		return [(0,text)]
+
+	pieces = []
+	for line in text.splitlines(True):
+		if len(line) > maxChunkLength:
+			pieces += _splitLongText(line,maxChunkLength)
+		else:
+			pieces.append(line)
+
+	chunks = []
+	chunkStart,chunk = 0,''
+	for piece in pieces:
+		if chunk and len(chunk) + len(piece) > maxChunkLength:
+			chunks.append((chunkStart,chunk))
+			chunkStart,chunk = chunkStart+len(chunk),''
+		chunk += piece
+	if chunk:
+		chunks.append((chunkStart,chunk))
+
+	return chunks
+
+def _splitIntoLines(text,maxChunkLength):
+	# Split text into (offset,line) pieces for each non-blank line with the surrounding whitespace removed. Lines longer than maxChunkLength (if provided) are split further
+	lines = []
+	offset = 0
+	for line in text.splitlines(True):
+		if maxChunkLength is not None and len(line) > maxChunkLength:
+			pieces = _splitLongText(line,maxChunkLength)
+		else:
+			pieces = [line]
+
+		for piece in pieces:
+			stripped = piece.strip()
+			if stripped:
+				lines.append((offset+len(piece)-len(piece.lstrip()),stripped))
+			offset += len(piece)
+	return lines
+
+_workerNLP = None
+_workerBatchSize = None
+
+def _initParserWorker(model,annotations,backend,batchSize):
+	global _workerNLP,_workerBatchSize
+	_workerNLP = _loadModel(model,annotations,backend)
+	_workerBatchSize = batchSize
+
+def _parseShard(texts):
+	return [ _compactSentences(parsed) for parsed in _workerNLP.pipe(texts, batch_size=_workerBatchSize) ]
 
 class Parser:
 	"""
 	Runs Spacy on corpus to get sentences and associated tokens
 	
 	:ivar model: Model for parsing (e.g. en/de/es/pt/fr/it/nl)
+	:ivar backend: Whether the Spacy model is used ('spacy') or only a rule-based tokenizer and sentencizer ('rules')
 	:ivar nlp: The underlying Spacy language model to use for parsing
+	:ivar batchSize: Number of documents that are passed to Spacy at once (None uses the Spacy default)
+	:ivar processCount: Number of worker processes used for parsing
+	:ivar cache: On-disk cache of previously parsed documents (or None if caching is not used)
+	:ivar entityMapping: Method used to match entities to tokens ('sweep' or 'intervaltree')
+	:ivar annotations: Annotations that the parser provides beyond tokens and sentences (a subset of 'lemmas', 'partsofspeech' and 'dependencies')
+	:ivar maxChunkLength: Maximum number of characters that are passed to Spacy at once (or None to parse whole documents)
+	:ivar deduplicate: Whether repeated lines of text are only parsed once
+	:ivar reusedParseCount: Number of lines whose parse was reused instead of being parsed again (when deduplicate is used)
 	"""
 
 	_models = {}
+
+	validAnnotations = ['lemmas','partsofspeech','dependencies']
+	
+	_maxDeduplicationMemoSize = 100000
 	
-	def __init__(self,model='en_core_web_sm'):
+	def __init__(self,model='en_core_web_sm',batchSize=None,processCount=1,cacheDirectory=None,cacheMaxSize=1024**3,entityMapping='sweep',annotations=None,maxChunkLength=None,deduplicate=False,backend='spacy'):
 		"""
 		Create a Parser object that will use Spacy for parsing. It offers all the same languages that Spacy offers. Check out: https://spacy.io/usage/models. Note that the language model needs to be downloaded first (e.g. python -m spacy download en)
 		
 		:param model: Name of an available Spacy language model for parsing (e.g. en/de/es/pt/fr/it/nl)
+		:param batchSize: Number of documents that are streamed through Spacy together (None uses the Spacy default)
+		:param processCount: Number of worker processes to parse with. Each worker loads the Spacy model once and parses shards of documents.
+		:param cacheDirectory: Optional directory for an on-disk cache of parses. Documents that have been parsed before (with the same model and Spacy version) are loaded from it instead of being parsed again.
+		:param cacheMaxSize: Maximum size (in bytes) of the on-disk cache. The least recently used parses are removed when it is exceeded.
+		:param entityMapping: Method used to match entities to tokens. 'sweep' makes a single pass through the sorted entity spans for each document. 'intervaltree' queries an interval tree for each token.
+		:param annotations: Annotations needed beyond tokens and sentences (a subset of 'lemmas', 'partsofspeech' and 'dependencies'). Spacy components that are only needed for the others are disabled. Tokens will have empty lemmas/parts-of-speech and sentences will have no dependencies if they aren't included. None will provide all of them.
+		:param maxChunkLength: Optional maximum number of characters to parse at once. Longer documents are split into chunks at line (e.g. paragraph or passage) boundaries and each chunk is parsed separately, so memory use doesn't grow with document length. Sentences never cross a chunk boundary.
+		:param deduplicate: Whether to parse each line (e.g. paragraph or passage) separately and reuse the parse of any line that this parser has already seen (e.g. copyright or funding statements, or abstracts duplicated across passages). Only the token positions and entity annotations are recalculated for a repeated line. Whitespace between lines is not tokenized.
+		:param backend: 'spacy' to parse with the Spacy model, or 'rules' to only use Spacy's rule-based tokenizer and a punctuation-based sentencizer for the language of the model (e.g. en for en_core_web_sm). The 'rules' backend is much faster but provides no lemmas, parts-of-speech or dependencies, so it suits dictionary-based entity recognition and the entityTypes, unigramsBetweenEntities and bigrams features of the :class:`kindred.Vectorizer` (the dependency path features will be empty).
 		:type model: str
+		:type batchSize: int
+		:type processCount: int
+		:type cacheDirectory: str
+		:type cacheMaxSize: int
+		:type entityMapping: str
+		:type annotations: list of str
+		:type maxChunkLength: int
+		:type deduplicate: bool
+		:type backend: str
 		"""
 
-		# We only load spacy if a Parser is created (to allow ReadTheDocs to build the documentation easily)
-		import spacy
+		assert batchSize is None or (isinstance(batchSize,int) and batchSize > 0), "batchSize must be a positive integer or None"
+		assert isinstance(processCount,int) and processCount > 0, "processCount must be a positive integer"
+		assert entityMapping in ['sweep','intervaltree'], "entityMapping must be 'sweep' or 'intervaltree'"
+
+		assert maxChunkLength is None or (isinstance(maxChunkLength,int) and maxChunkLength > 0), "maxChunkLength must be a positive integer or None"
+		assert isinstance(deduplicate,bool), "deduplicate must be True or False"
+		assert backend in ['spacy','rules'], "backend must be 'spacy' or 'rules'"
+
+		if annotations is None:
+			annotations = Parser.validAnnotations if backend == 'spacy' else []
+		assert isinstance(annotations,list)
+		for annotation in annotations:
+			assert annotation in Parser.validAnnotations, "Annotation (%s) is not a valid annotation. Must be one of %s" % (annotation,str(Parser.validAnnotations))
+		assert backend == 'spacy' or annotations == [], "The 'rules' backend only provides tokens and sentences"
 
 		self.model = model
+		self.backend = backend
+		self.annotations = sorted(set(annotations))
+		self.nlp = _loadModel(model,self.annotations,backend)
+		self.batchSize = batchSize
+		self.processCount = processCount
+		self.entityMapping = entityMapping
+		self.maxChunkLength = maxChunkLength
+		self.deduplicate = deduplicate
+		self.reusedParseCount = 0
+		self._deduplicationMemo = OrderedDict()
+		self._pendingLineCells = {}
+
+		self.cache = None
+		if cacheDirectory is not None:
+			import spacy
+			self.cache = ParseCache(cacheDirectory,maxSize=cacheMaxSize)
+			self._cacheConfiguration = "model=%s backend=%s version=%s spacy=%s annotations=%s maxChunkLength=%s deduplicate=%s" % (model,backend,self.nlp.meta.get('version'),spacy.__version__,",".join(self.annotations),str(maxChunkLength),str(deduplicate))
+
+	def _textsGenerator(self,documents):
+		for d in documents:
+			text = d.text
+			if six.PY2 and isinstance(text,str):
+				text = unicode(text)
+			yield text
 
-		if not model in Parser._models:
-			Parser._models[model] = spacy.load(model, disable=['ner'])
+	def _shardSize(self):
+		return self.batchSize if self.batchSize else 100
 
-		self.nlp = Parser._models[model]
+	def _windowsGenerator(self,documents):
+		# Read ahead enough documents to keep every worker busy, but never more. Up to two windows are in flight when parsing with worker processes.
+		windowSize = self.processCount * self._shardSize()
+		window = []
+		for d in documents:
+			window.append(d)
+			if len(window) >= windowSize:
+				yield window
+				window = []
+		if window:
+			yield window
 
-	def _sentencesGenerator(self,text):
-		if six.PY2 and isinstance(text,str):
-			text = unicode(text)
+	def _planDeduplicatedParses(self,texts):
+		linesForTexts = [ _splitIntoLines(text,self.maxChunkLength) for text in texts ]
 
-		parsed = self.nlp(text)
+		# Each line maps to a cell that holds its parse once it is available. Lines seen before share the cell of their first occurrence, even if that is still being parsed for an earlier window. Cells only move to the memo once they are filled, so a stopped parse can't leave empty ones behind.
+		lineCells = {}
+		linesToParse,cellsToParse = [],[]
+		for lines in linesForTexts:
+			for _,line in lines:
+				if line in lineCells:
+					continue
+				elif line in self._deduplicationMemo:
+					self._deduplicationMemo.move_to_end(line)
+					lineCells[line] = self._deduplicationMemo[line]
+				elif line in self._pendingLineCells:
+					lineCells[line] = self._pendingLineCells[line]
+				else:
+					cell = [None]
+					lineCells[line] = cell
+					self._pendingLineCells[line] = cell
+					linesToParse.append(line)
+					cellsToParse.append(cell)
 
-		for sent in parsed.sents:
-			yield sent
+		def assemble(lineParses):
+			for line,cell,compact in zip(linesToParse,cellsToParse,lineParses):
+				cell[0] = compact
+				self._deduplicationMemo[line] = cell
+				self._pendingLineCells.pop(line,None)
+
+			while len(self._deduplicationMemo) > Parser._maxDeduplicationMemoSize:
+				self._deduplicationMemo.popitem(last=False)
+
+			self.reusedParseCount += sum( len(lines) for lines in linesForTexts ) - len(linesToParse)
+
+			compacts = []
+			for lines in linesForTexts:
+				compact = []
+				for offset,line in lines:
+					compact += _offsetCompactSentences(lineCells[line][0],offset)
+				compacts.append(compact)
+			return compacts
+
+		return linesToParse,assemble
+
+	def _planCompactParses(self,documents):
+		# Returns the texts that need to be parsed and a function that turns their parses (in the same order) into the compact parses of the documents
+		texts = list(self._textsGenerator(documents))
+		if self.deduplicate:
+			return self._planDeduplicatedParses(texts)
+		elif self.maxChunkLength is None:
+			return texts,list
+
+		chunkCounts,chunkOffsets,chunkTexts = [],[],[]
+		for text in texts:
+			chunks = _splitIntoChunks(text,self.maxChunkLength)
+			chunkCounts.append(len(chunks))
+			chunkOffsets += [ offset for offset,_ in chunks ]
+			chunkTexts += [ chunkText for _,chunkText in chunks ]
+
+		def assemble(chunkParses):
+			# Stitch the chunks back together with positions relative to the full document
+			compacts = []
+			chunkIndex = 0
+			for chunkCount in chunkCounts:
+				compact = []
+				for offset,chunkParse in zip(chunkOffsets[chunkIndex:chunkIndex+chunkCount],chunkParses[chunkIndex:chunkIndex+chunkCount]):
+					compact += _offsetCompactSentences(chunkParse,offset)
+				compacts.append(compact)
+				chunkIndex += chunkCount
+			return compacts
+
+		return chunkTexts,assemble
+
+	def _planCachedCompactParses(self,documents):
+		if self.cache is None:
+			return self._planCompactParses(documents)
+
+		keys = [ self.cache.getKey(text,self._cacheConfiguration) for text in self._textsGenerator(documents) ]
+		compacts = [ self.cache.get(key) for key in keys ]
+
+		# Only the documents missing from the cache are sent through Spacy
+		uncachedDocuments = [ d for d,compact in zip(documents,compacts) if compact is None ]
+		texts,assembleUncached = self._planCompactParses(uncachedDocuments)
+
+		def assemble(parses):
+			uncachedParses = iter(assembleUncached(parses))
+			for i,key in enumerate(keys):
+				if compacts[i] is None:
+					compacts[i] = next(uncachedParses)
+					self.cache.set(key,compacts[i])
+			return compacts
+
+		return texts,assemble
+
+	def _documentsToParse(self,window):
+		documents = []
+		for d in window:
+			assert isinstance(d,kindred.Document)
+			if d.hasParsedAnnotations(self.annotations):
+				continue
+
+			# A parse that lacks some of the annotations is replaced
+			d.sentences = []
+			d.parsed = False
+			documents.append(d)
+		return documents
+
+	def _shardsGenerator(self,shardQueue):
+		# Feeds pool.imap with the shards that iterParse submits. It blocks until more are submitted, so iterParse decides how far ahead the workers read.
+		while True:
+			shard = shardQueue.get()
+			if shard is None:
+				return
+			yield shard
+
+	def iterParse(self,documents,vocabulary=None):
+		"""
+		Parse a stream of documents and yield each one once it has been parsed. Only a small window of documents is held at a time, so this can be used on corpora that do not fit in memory (e.g. documents from :func:`kindred.iterLoad`). It uses the same batching, worker processes and cache as :meth:`parse`. Documents that have already been parsed are yielded without being parsed again, unless their parse lacks annotations that this parser provides.
+
+		:param documents: Iterable of documents to parse
+		:param vocabulary: Vocabulary to intern the words, lemmas, parts-of-speech and dependency types in. If not provided, each window of documents gets a new vocabulary so that memory use doesn't grow with the stream
+		:type documents: iterable of kindred.Document
+		:type vocabulary: kindred.Vocabulary
+		:return: Parsed documents in the same order
+		:rtype: generator of kindred.Document
+		"""
+
+		if self.processCount == 1:
+			try:
+				for window in self._windowsGenerator(documents):
+					# Documents that have already been parsed (with the annotations that this parser provides) are passed through unchanged
+					unparsed = self._documentsToParse(window)
+					texts,assemble = self._planCachedCompactParses(unparsed)
+					parses = [ _compactSentences(parsed) for parsed in self.nlp.pipe(texts, batch_size=self.batchSize) ]
+					windowVocabulary = kindred.Vocabulary() if vocabulary is None else vocabulary
+					for d,compactSentences in zip(unparsed,assemble(parses)):
+						addCompactSentencesToDocument(d,compactSentences,windowVocabulary,self.entityMapping,self.annotations)
+
+					for d in window:
+						yield d
+			finally:
+				# Lines of a window that was never finished (e.g. the parse failed) aren't waiting for a parse any more
+				self._pendingLineCells.clear()
+			return
+
+		shardSize = self._shardSize()
+		shardQueue = queue.Queue()
+		pool = multiprocessing.Pool(self.processCount, initializer=_initParserWorker, initargs=(self.model,self.annotations,self.backend,self.batchSize))
+
+		try:
+			# imap returns the shards in the order they were submitted, so documents stay aligned. The workers parse the next window while the sentences of the current one are built.
+			shardResults = pool.imap(_parseShard, self._shardsGenerator(shardQueue))
+			inFlight = []
+
+			for window in self._windowsGenerator(documents):
+				unparsed = self._documentsToParse(window)
+				texts,assemble = self._planCachedCompactParses(unparsed)
+				shardCount = 0
+				for i in range(0,len(texts),shardSize):
+					shardQueue.put(texts[i:i+shardSize])
+					shardCount += 1
+				windowVocabulary = kindred.Vocabulary() if vocabulary is None else vocabulary
+				inFlight.append((window,unparsed,assemble,shardCount,windowVocabulary))
+
+				if len(inFlight) > 1:
+					for d in self._finishWindow(inFlight.pop(0),shardResults):
+						yield d
+
+			shardQueue.put(None)
+			for windowInFlight in inFlight:
+				for d in self._finishWindow(windowInFlight,shardResults):
+					yield d
+		finally:
+			# The pool waits for the shards generator to finish before it can shut down
+			shardQueue.put(None)
+			pool.terminate()
+			self._pendingLineCells.clear()
+
+	def _finishWindow(self,windowInFlight,shardResults):
+		window,unparsed,assemble,shardCount,vocabulary = windowInFlight
+		parses = []
+		for _ in range(shardCount):
+			parses += next(shardResults)
+		for d,compactSentences in zip(unparsed,assemble(parses)):
+			addCompactSentencesToDocument(d,compactSentences,vocabulary,self.entityMapping,self.annotations)
+		return window
 
 	def parse(self,corpus):
 		"""
-		Parse the corpus. Each document will be split into sentences which are then tokenized and parsed for their dependency graph. All parsed information is stored within the corpus object.
+		Parse the corpus. Each document will be split into sentences which are then tokenized and parsed for their dependency graph. All parsed information is stored within the corpus object, with the strings interned in the vocabulary of the corpus. The document texts are streamed through Spacy in batches (see batchSize) and optionally across multiple worker processes (see processCount). If a cache directory was provided, previously parsed documents are loaded from the cache instead. Only documents that haven't been parsed yet are parsed, so documents added to an already parsed corpus can be parsed without parsing the rest again. Documents whose parse lacks annotations that this parser provides (e.g. after a parse with fewer annotations) are parsed again.
 		
 		:param corpus: Corpus to parse
 		:type corpus: kindred.Corpus
@@ -53,55 +480,5 @@ class Parser:
 
 		assert isinstance(corpus,kindred.Corpus)
 
-		# Ignore DeprecationWarning from SortedDict which is inside IntervalTree
-		import warnings
-		warnings.filterwarnings("ignore", category=DeprecationWarning)
-
-		for d in corpus.documents:
-			entityIDsToEntities = { entity.entityID:entity for entity in d.entities }
-		
-			denotationTree = IntervalTree()
-			entityTypeLookup = {}
-			for e in d.entities:
-				entityTypeLookup[e.entityID] = e.entityType
-			
-				for a,b in e.position:
-					if b > a:
-						denotationTree[a:b] = e.entityID
-				
-			for sentence in self._sentencesGenerator(d.text):
-				tokens = []
-				for t in sentence:
-					token = kindred.Token(t.text,t.lemma_,t.pos_,t.idx,t.idx+len(t.text))
-					tokens.append(token)
-
-				sentenceStart = tokens[0].startPos
-				sentenceEnd = tokens[-1].endPos
-				sentenceTxt = d.text[sentenceStart:sentenceEnd]
-
-				indexOffset = sentence[0].i
-				dependencies = []
-				for t in sentence:
-					depName = t.dep_
-					dep = (t.head.i-indexOffset,t.i-indexOffset,depName)
-					dependencies.append(dep)
-
-				entityIDsToTokenLocs = defaultdict(list)
-				for i,t in enumerate(tokens):
-					entitiesOverlappingWithToken = denotationTree[t.startPos:t.endPos]
-					for interval in entitiesOverlappingWithToken:
-						entityID = interval.data
-						entityIDsToTokenLocs[entityID].append(i)
-
-				sentence = kindred.Sentence(sentenceTxt, tokens, dependencies, d.sourceFilename)
-				
-				# Let's gather up the information about the "known" entities in the sentence
-				for entityID,entityLocs in sorted(entityIDsToTokenLocs.items()):
-					# Get the entity associated with this ID
-					e = entityIDsToEntities[entityID]
-					sentence.addEntityAnnotation(e,entityLocs)
-					
-				d.addSentence(sentence)
-
-		corpus.parsed = True
-
+		for d in self.iterParse(corpus.documents,corpus.vocabulary):
+			pass
@@ -11,7 +11,11 @@ class Relation:
 	:ivar argNames: Names of relation argument associated with each entity
 	:ivar probability: Optional probability for predicted relations
 	:ivar sourceRelationID: Relation ID used in source document
+
+	The hash of a relation is cached (and reset when relationType, entities, argNames or probability is set), so the entities and argNames lists should be replaced rather than modified in place.
 	"""
+
+	__slots__ = ['_relationType','_entities','_argNames','_probability','sourceRelationID','_hash']
 	
 	def __init__(self,relationType=None,entities=None,argNames=None,probability=None,sourceRelationID=None):
 		"""
@@ -33,29 +37,83 @@ class Relation:
 			entities = []
 
 		assert relationType is None or isinstance(relationType, six.string_types), "relationType must be a string"
-		self.relationType = relationType
+		self._relationType = relationType
 
 		assert isinstance(entities,list),  "entities must be a list of kindred.Entity"
 		for entity in entities:
 			assert isinstance(entity, kindred.Entity), "entities must be a list of kindred.Entity"
-		self.entities = entities
+		self._entities = entities
 
 		if argNames == None:
-			self.argNames = None
+			self._argNames = None
 		else:
 			assert len(argNames) == len(entities)
-			self.argNames = [ str(a) for a in argNames ]
+			self._argNames = [ str(a) for a in argNames ]
 
 		if not probability is None:
 			assert isinstance(probability, float)
-		self.probability = probability
+		self._probability = probability
 
 		self.sourceRelationID = sourceRelationID
+		self._hash = None
+
+	# The attributes used by the hash are properties so that setting one resets the cached hash
+	@property
+	def relationType(self):
+		return self._relationType
+
+	@relationType.setter
+	def relationType(self, relationType):
+		self._relationType = relationType
+		self._hash = None
+
+	@property
+	def entities(self):
+		return self._entities
+
+	@entities.setter
+	def entities(self, entities):
+		self._entities = entities
+		self._hash = None
+
+	@property
+	def argNames(self):
+		return self._argNames
+
+	@argNames.setter
+	def argNames(self, argNames):
+		self._argNames = argNames
+		self._hash = None
+
+	@property
+	def probability(self):
+		return self._probability
+
+	@probability.setter
+	def probability(self, probability):
+		self._probability = probability
+		self._hash = None
 	
+	_valueAttributes = ['relationType','entities','argNames','probability','sourceRelationID']
+
+	def __getstate__(self):
+		# The cached hash isn't pickled as it can depend on object identities
+		return { a:getattr(self,a) for a in Relation._valueAttributes }
+
+	def __setstate__(self, state):
+		# Older versions pickled the attributes without underscores (e.g. entities rather than _entities) which also go through the properties here
+		self._hash = None
+		for name,value in state.items():
+			setattr(self, name, value)
+
 	def __eq__(self, other):
 		"""Override the default Equals behavior"""
+		if self is other:
+			return True
 		if isinstance(other, self.__class__):
-			return self.__dict__ == other.__dict__
+			if hash(self) != hash(other):
+				return False
+			return all( getattr(self,a) == getattr(other,a) for a in Relation._valueAttributes )
 		return False
 	
 	def __ne__(self, other):
@@ -69,8 +127,26 @@ class Relation:
 		return self.__str__()
 
 	def __hash__(self):
-		if self.argNames is None:
-			return hash((self.relationType,tuple(self.entities),self.probability))
-		else:
-			return hash((self.relationType,tuple(self.entities),tuple(self.argNames),self.probability))
+		if self._hash is None:
+			if self.argNames is None:
+				self._hash = hash((self.relationType,tuple(self.entities),self.probability))
+			else:
+				self._hash = hash((self.relationType,tuple(self.entities),tuple(self.argNames),self.probability))
+		return self._hash
+
+	def valueEquals(self, other):
+		"""
+		Check whether another relation has the same type, argument names, probability and ID, and entities with the same values (see :meth:`kindred.Entity.valueEquals`)
+
+		:param other: Relation to compare to
+		:type other: kindred.Relation
+		:return: Whether the relations have the same values
+		:rtype: bool
+		"""
+
+		if not isinstance(other, self.__class__):
+			return False
+		if len(self.entities) != len(other.entities) or not all( e1.valueEquals(e2) for e1,e2 in zip(self.entities,other.entities) ):
+			return False
+		return all( getattr(self,a) == getattr(other,a) for a in Relation._valueAttributes if a != 'entities' )
 
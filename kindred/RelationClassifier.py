@@ -2,6 +2,7 @@
 from sklearn import svm
 from sklearn.linear_model import LogisticRegression
 from collections import defaultdict
+import itertools
 
 import kindred
 from kindred.CandidateBuilder import CandidateBuilder
@@ -18,10 +19,14 @@ class RelationClassifier:
 	:param threshold: A specific threshold to use for classification (which will then use a logistic regression classifier)
 	:param entityCount: Number of entities in each relation (default=2). Passed to the CandidateBuilder (if needed)
 	:param acceptedEntityTypes: Tuples of entity types that relations must match. None will match allow relations of any entity types. Passed to the CandidateBuilder (if needed)
+	:param maxTokenDistance: Maximum distance (in tokens) between the entities of a relation (or None for no limit). Passed to the CandidateBuilder
+	:param maxDependencyDistance: Maximum dependency path distance between the entities of a relation (or None for no limit). Passed to the CandidateBuilder
+	:param symmetric: Whether the relations are undirected, so each set of entities is only classified once. Passed to the CandidateBuilder
 	:param isTrained: Whether the classifier has been trained yet. Will throw an error if predict is called before it is trained.
+	:param parseCacheDirectory: Directory of the on-disk parse cache used when a corpus needs parsing (or None to not cache)
 	"""
 	
-	def __init__(self,classifierType='SVM',tfidf=True,features=None,threshold=None,entityCount=2,acceptedEntityTypes=None,model='en_core_web_sm'):
+	def __init__(self,classifierType='SVM',tfidf=True,features=None,threshold=None,entityCount=2,acceptedEntityTypes=None,model='en_core_web_sm',parseCacheDirectory=None,maxTokenDistance=None,maxDependencyDistance=None,symmetric=False):
 		"""
 		Constructor for the RelationClassifier class
 		
@@ -32,6 +37,10 @@ class RelationClassifier:
 		:param entityCount: Number of entities in each relation (default=2). Passed to the CandidateBuilder (if needed)
 		:param acceptedEntityTypes: Tuples of entity types that relations must match. None will match allow relations of any entity types. Passed to the CandidateBuilder (if needed)
 		:param model: Name of an available Spacy language model for any parsing needed (e.g. en/de/es/pt/fr/it/nl)
+		:param parseCacheDirectory: Optional directory for an on-disk cache of parses so that repeated training/prediction on the same documents doesn't need to run Spacy again
+		:param maxTokenDistance: Maximum distance (in tokens) between each pair of entities in a relation. Candidate relations with entities further apart are not classified (and not used for training). None will not limit it.
+		:param maxDependencyDistance: Maximum number of edges on the dependency path between each pair of entities in a relation. Candidate relations with entities further apart are not classified (and not used for training). None will not limit it.
+		:param symmetric: Whether the relations are undirected (e.g. co-occurrence or interaction). Each set of entities is then only vectorized and classified once, and predicted relations have their entities in the order they are in the document.
 		:type classifierType: str
 		:type tfidf: bool
 		:type features: list of str
@@ -39,6 +48,10 @@ class RelationClassifier:
 		:type entityCount: int
 		:type acceptedEntityTypes: list of tuples
 		:type model: str
+		:type parseCacheDirectory: str
+		:type maxTokenDistance: int
+		:type maxDependencyDistance: int
+		:type symmetric: bool
 		"""
 		assert classifierType in ['SVM','LogisticRegression'], "classifierType must be 'SVM' or 'LogisticRegression'"
 		assert classifierType == 'LogisticRegression' or threshold is None, "Threshold can only be used when classifierType is 'LogisticRegression'"
@@ -62,61 +75,94 @@ class RelationClassifier:
 			
 		self.threshold = threshold
 		self.model = model
+		self.parseCacheDirectory = parseCacheDirectory
+		self.maxTokenDistance = maxTokenDistance
+		self.maxDependencyDistance = maxDependencyDistance
+
+		assert isinstance(symmetric,bool)
+		self.symmetric = symmetric
+
+	def __setstate__(self,state):
+		# Classifiers pickled by older versions don't have the newer options and generate candidates for prediction with the training candidate builder
+		self.__dict__.update(state)
+		for name,default in [('parseCacheDirectory',None),('maxTokenDistance',None),('maxDependencyDistance',None),('symmetric',False)]:
+			if not name in state:
+				setattr(self,name,default)
+		if self.isTrained and not 'predictionCandidateBuilder' in state:
+			self.predictionCandidateBuilder = self.candidateBuilder
+
+	def _getRequiredAnnotations(self):
+		annotations = self.vectorizer.getRequiredAnnotations()
+		if not self.maxDependencyDistance is None and not 'dependencies' in annotations:
+			annotations = sorted(annotations + ['dependencies'])
+		return annotations
+
+	def _parseIfNeeded(self,corpus):
+		# A corpus parsed earlier with fewer annotations (e.g. for other features) is parsed again
+		requiredAnnotations = self._getRequiredAnnotations()
+		if not all( doc.hasParsedAnnotations(requiredAnnotations) for doc in corpus.documents ):
+			parser = kindred.Parser(model=self.model,cacheDirectory=self.parseCacheDirectory,annotations=requiredAnnotations)
+			parser.parse(corpus)
 
 	def train(self,corpus):
 		"""
-		Trains the classifier using this corpus. All relations in the corpus will be used for training.
+		Trains the classifier using this corpus. All relations in the corpus will be used for training. If the corpus needs to be parsed, only the parts of the Spacy pipeline needed by the chosen features are run. A table of candidate relations (from :meth:`kindred.CandidateBuilder.buildTable`) can be used instead of a corpus, in which case the valid entity types for each relation type come from the candidate relations with known relations.
 
-		:param corpus: Corpus to use for training
-		:type corpus: kindred.Corpus
+		:param corpus: Corpus to use for training (or a table of candidate relations built from one)
+		:type corpus: kindred.Corpus or kindred.CandidateTable
 		"""
-		assert isinstance(corpus,kindred.Corpus)
+		assert isinstance(corpus,(kindred.Corpus,kindred.CandidateTable))
 
-		if not corpus.parsed:
-			parser = kindred.Parser(model=self.model)
-			parser.parse(corpus)
+		self.vectorizer = Vectorizer(entityCount=self.entityCount,featureChoice=self.chosenFeatures,tfidf=self.tfidf)
+		self.candidateBuilder = CandidateBuilder(entityCount=self.entityCount,acceptedEntityTypes=self.acceptedEntityTypes,maxTokenDistance=self.maxTokenDistance,maxDependencyDistance=self.maxDependencyDistance,symmetric=self.symmetric)
+
+		if isinstance(corpus,kindred.CandidateTable):
+			candidateTable = corpus
+			assert candidateTable.entityCount == self.entityCount, "Relation classifier is expecting candidate relations with %d entities (entityCount=%d) but the table has candidate relations with %d entities" % (self.entityCount,self.entityCount,candidateTable.entityCount)
+		else:
+			self._parseIfNeeded(corpus)
 		
-		self.candidateBuilder = CandidateBuilder(entityCount=self.entityCount,acceptedEntityTypes=self.acceptedEntityTypes)
-		candidateRelations = self.candidateBuilder.build(corpus)
+			# The candidates are kept as a compact table (rather than CandidateRelation objects) while training
+			candidateTable = self.candidateBuilder.buildTable(corpus)
 
-		if len(candidateRelations) == 0:
+		if len(candidateTable) == 0:
 			raise RuntimeError("No candidate relations found in corpus for training. Does the corpus contain text and entity annotations with at least one sentence containing %d entities." % (self.entityCount))
 
-		candidateRelationKeys = set()
-		for cr in candidateRelations:
-			assert isinstance(cr,kindred.CandidateRelation)
-			for knownType,knownArgNames in cr.knownTypesAndArgNames:
-				relKey = tuple([knownType] + knownArgNames)
-				candidateRelationKeys.add(relKey)
-		
 		# Create mappings from the class index to a relation type and back again
-		self.colToRelType = sorted(list(candidateRelationKeys))
+		self.colToRelType = sorted(list(candidateTable.labelKeys))
 		self.relTypeToCol = { relationType:i for i,relationType in enumerate(self.colToRelType) }
 		
-		Y = np.zeros((len(candidateRelations),len(self.colToRelType)),np.int32)
+		labelMatrix = candidateTable.getLabelMatrix()
+		Y = labelMatrix[:,[ candidateTable.labelKeys.index(relKey) for relKey in self.colToRelType ]].astype(np.int32)
 		
-		candidateClasses = []
-		for i,cr in enumerate(candidateRelations):
-			for knownType,knownArgNames in cr.knownTypesAndArgNames:
-				relKey = tuple([knownType] + knownArgNames)
-				col = self.relTypeToCol[relKey]
-				Y[i,col] = 1
+		if isinstance(corpus,kindred.Corpus):
+			entityCountsInRelations = set([ len(r.entities) for r in corpus.getRelations() ])
+			entityCountsInRelations = sorted(list(set(entityCountsInRelations)))
+			assert self.entityCount in entityCountsInRelations, "Relation classifier is expecting to train on relations with %d entities (entityCount=%d). But the known relations in the corpus contain relations with the following entity counts: %s. Perhaps the entityCount parameter should be changed or there is a problem with the training corpus." % (self.entityCount,self.entityCount,str(entityCountsInRelations))
 
-		entityCountsInRelations = set([ len(r.entities) for r in corpus.getRelations() ])
-		entityCountsInRelations = sorted(list(set(entityCountsInRelations)))
-		assert self.entityCount in entityCountsInRelations, "Relation classifier is expecting to train on relations with %d entities (entityCount=%d). But the known relations in the corpus contain relations with the following entity counts: %s. Perhaps the entityCount parameter should be changed or there is a problem with the training corpus." % (self.entityCount,self.entityCount,str(entityCountsInRelations))
+			relKeysAndEntityTypes = [ (tuple([r.relationType] + r.argNames),tuple([ e.entityType for e in r.entities ])) for r in corpus.getRelations() ]
+		else:
+			candidatesWithRelations = [ candidateTable[i] for i in np.flatnonzero(labelMatrix.any(axis=1)) ]
+			relKeysAndEntityTypes = [ (tuple([knownType] + knownArgNames),tuple([ e.entityType for e in cr.entities ])) for cr in candidatesWithRelations for knownType,knownArgNames in cr.knownTypesAndArgNames ]
 
 		self.relTypeToValidEntityTypes = defaultdict(set)
-
-		for d in corpus.documents:
-			for r in d.relations:
-				validEntityTypes = tuple([ e.entityType for e in r.entities ])
-				
-				relKey = tuple([r.relationType] + r.argNames)
+		for relKey,validEntityTypes in relKeysAndEntityTypes:
+			if self.symmetric:
+				# Predictions have the entities (and their argument names) in document order so they can be in any order
+				relationType,argNames = relKey[0],relKey[1:]
+				for order in itertools.permutations(range(len(validEntityTypes))):
+					reorderedRelKey = tuple([relationType] + [ argNames[i] for i in order ])
+					self.relTypeToValidEntityTypes[reorderedRelKey].add(tuple( validEntityTypes[i] for i in order ))
+			else:
 				self.relTypeToValidEntityTypes[relKey].add(validEntityTypes)
 
-		self.vectorizer = Vectorizer(entityCount=self.entityCount,featureChoice=self.chosenFeatures,tfidf=self.tfidf)
-		trainVectors = self.vectorizer.fit_transform(candidateRelations)
+		# Predictions are only kept if they match the entity types of a training relation, so only those candidates need to be generated
+		predictionEntityTypes = set( entityTypes for validEntityTypes in self.relTypeToValidEntityTypes.values() for entityTypes in validEntityTypes if len(entityTypes) == self.entityCount )
+		if not self.acceptedEntityTypes is None:
+			predictionEntityTypes = predictionEntityTypes.intersection(self.acceptedEntityTypes)
+		self.predictionCandidateBuilder = CandidateBuilder(entityCount=self.entityCount,acceptedEntityTypes=sorted(list(predictionEntityTypes)),maxTokenDistance=self.maxTokenDistance,maxDependencyDistance=self.maxDependencyDistance,symmetric=self.symmetric)
+
+		trainVectors = self.vectorizer.fit_transform(candidateTable)
 	
 		assert trainVectors.shape[0] == Y.shape[0]
 
@@ -138,27 +184,7 @@ class RelationClassifier:
 		
 		self.isTrained = True
 
-	def predict(self,corpus):
-		"""
-		Use the relation classifier to predict new relations for a corpus. The new relations will be added to the Corpus.
-
-		:param corpus: Corpus to make predictions on
-		:type corpus: kindred.Corpus
-		"""
-		assert self.isTrained, "Classifier must be trained using train() before predictions can be made"
-	
-		assert isinstance(corpus,kindred.Corpus)
-		
-		if not corpus.parsed:
-			parser = kindred.Parser(model=self.model)
-			parser.parse(corpus)
-		
-		candidateRelations = self.candidateBuilder.build(corpus)
-
-		# Check if there are any candidate relations to classify in this corpus
-		if len(candidateRelations) == 0:
-			return
-		
+	def _predictCandidateRelations(self,candidateRelations):
 		predictedRelations = []
 		testVectors = self.vectorizer.transform(candidateRelations)
 
@@ -187,12 +213,40 @@ class RelationClassifier:
 			predictedRelation = kindred.Relation(relType,candidateRelation.entities,argNames=argNames,probability=predictedProb)
 			predictedRelations.append(predictedRelation)
 
+		return predictedRelations
+
+	def predict(self,corpus,batchSize=10000):
+		"""
+		Use the relation classifier to predict new relations for a corpus. The new relations will be added to the Corpus.
+
+		:param corpus: Corpus to make predictions on
+		:param batchSize: Number of candidate relations to vectorize and classify at a time (which limits the memory used for large corpora)
+		:type corpus: kindred.Corpus
+		:type batchSize: int
+		"""
+		assert self.isTrained, "Classifier must be trained using train() before predictions can be made"
+	
+		assert isinstance(corpus,kindred.Corpus)
+		
+		self._parseIfNeeded(corpus)
+		
+		predictedRelations = []
+		for candidateRelations in self.predictionCandidateBuilder.iterBuild(corpus,batchSize=batchSize):
+			predictedRelations += self._predictCandidateRelations(candidateRelations)
+
+		# Nothing to add if no relations were predicted
+		if len(predictedRelations) == 0:
+			return
+
 		# Add the predicted relations into the corpus
 		entitiesToDoc = {}
 		for i,doc in enumerate(corpus.documents):
 			for e in doc.entities:
 				entitiesToDoc[e] = i
 
+		# Relations already in each document (as sets so that the check for duplicates doesn't scan the document)
+		existingRelations = {}
+
 		for predictedRelation in predictedRelations:
 			docIDs = [ entitiesToDoc[e] for e in predictedRelation.entities ]
 			docIDs = list(set(docIDs))
@@ -200,6 +254,9 @@ class RelationClassifier:
 			assert len(docIDs) == 1, "Predicted relation contains entities that are spread across documents"
 
 			docID = docIDs[0]
-			if not predictedRelation in corpus.documents[docID].relations:
+			if not docID in existingRelations:
+				existingRelations[docID] = set(corpus.documents[docID].relations)
+			if not predictedRelation in existingRelations[docID]:
 				corpus.documents[docID].addRelation(predictedRelation)
+				existingRelations[docID].add(predictedRelation)
 
@@ -3,20 +3,30 @@ import networkx as nx
 import itertools
 import sys
 import six
+import numpy as np
 from collections import defaultdict
 
 class Sentence:
 	"""
-	Set of tokens for a sentence after parsing
+	Set of tokens for a sentence after parsing. The token and dependency information is stored in columns (NumPy arrays) with the strings interned in a :class:`kindred.Vocabulary`. The Token objects and dependency tuples are only created when the tokens and dependencies are first used. To change them, assign new lists to tokens or dependencies, as editing the returned lists (or their Token objects) in place does not update the columns.
 	
 	:ivar text: Text of the sentence
 	:ivar tokens: List of tokens in sentence
 	:ivar dependencies: List of dependencies from dependency path. Should be a list of tuples with form (tokenindex1,tokenindex2,dependency_type)
 	:ivar sourceFilename: Filename of the source document
 	:ivar entityAnnotations: List of entities associated with token indices
+	:ivar vocabulary: Vocabulary that the word, lemma, part-of-speech and dependency type IDs refer to
+	:ivar wordIDs: Array of the vocabulary ID of the word of each token
+	:ivar lemmaIDs: Array of the vocabulary ID of the lemma of each token
+	:ivar partofspeechIDs: Array of the vocabulary ID of the part-of-speech of each token
+	:ivar startPositions: Array of the start position of each token in the document text
+	:ivar endPositions: Array of the end position of each token in the document text
+	:ivar dependencySources: Array of the first token index (tokenindex1) of each dependency
+	:ivar dependencyTargets: Array of the second token index (tokenindex2) of each dependency
+	:ivar dependencyTypeIDs: Array of the vocabulary ID of the type of each dependency
 	"""
 	
-	def __init__(self, text, tokens, dependencies, sourceFilename=None):
+	def __init__(self, text, tokens, dependencies, sourceFilename=None, vocabulary=None):
 		"""
 		Constructor for Sentence class
 	
@@ -24,19 +34,117 @@ class Sentence:
 		:param tokens: List of tokens in sentence
 		:param dependencies: List of dependencies from dependency path. Should be a list of tuples with form (tokenindex1,tokenindex2,dependency_type)
 		:param sourceFilename: Filename of the source document
+		:param vocabulary: Vocabulary to intern the strings in (a new one is created if not provided)
 		:type text: str
 		:type tokens: list of kindred.Token
 		:type dependencies: list of tuples
 		:type sourceFilename: str
+		:type vocabulary: kindred.Vocabulary
 		"""
 
 		assert isinstance(text, six.string_types)
 
+		self.text = text
+		self.sourceFilename = sourceFilename
+		self.vocabulary = kindred.Vocabulary() if vocabulary is None else vocabulary
+
+		self.tokens = tokens
+		self.dependencies = dependencies
+		
+		self.entityAnnotations = []
+
+	@staticmethod
+	def fromColumns(text, vocabulary, wordIDs, lemmaIDs, partofspeechIDs, startPositions, endPositions, dependencySources, dependencyTargets, dependencyTypeIDs, sourceFilename=None):
+		"""
+		Create a sentence directly from columns of token and dependency information without creating any Token objects
+
+		:param text: Text of the sentence
+		:param vocabulary: Vocabulary that the IDs refer to
+		:param wordIDs: Vocabulary ID of the word of each token
+		:param lemmaIDs: Vocabulary ID of the lemma of each token
+		:param partofspeechIDs: Vocabulary ID of the part-of-speech of each token
+		:param startPositions: Start position of each token in the document text
+		:param endPositions: End position of each token in the document text
+		:param dependencySources: First token index (tokenindex1) of each dependency
+		:param dependencyTargets: Second token index (tokenindex2) of each dependency
+		:param dependencyTypeIDs: Vocabulary ID of the type of each dependency
+		:param sourceFilename: Filename of the source document
+		:type text: str
+		:type vocabulary: kindred.Vocabulary
+		:type wordIDs: list or numpy.ndarray of ints
+		:type lemmaIDs: list or numpy.ndarray of ints
+		:type partofspeechIDs: list or numpy.ndarray of ints
+		:type startPositions: list or numpy.ndarray of ints
+		:type endPositions: list or numpy.ndarray of ints
+		:type dependencySources: list or numpy.ndarray of ints
+		:type dependencyTargets: list or numpy.ndarray of ints
+		:type dependencyTypeIDs: list or numpy.ndarray of ints
+		:type sourceFilename: str
+		:return: The sentence
+		:rtype: kindred.Sentence
+		"""
+
+		assert isinstance(text, six.string_types)
+		assert isinstance(vocabulary, kindred.Vocabulary)
+
+		sentence = Sentence.__new__(Sentence)
+		sentence.text = text
+		sentence.sourceFilename = sourceFilename
+		sentence.vocabulary = vocabulary
+
+		sentence.wordIDs = np.asarray(wordIDs, dtype=np.int32)
+		sentence.lemmaIDs = np.asarray(lemmaIDs, dtype=np.int32)
+		sentence.partofspeechIDs = np.asarray(partofspeechIDs, dtype=np.int32)
+		sentence.startPositions = np.asarray(startPositions, dtype=np.int32)
+		sentence.endPositions = np.asarray(endPositions, dtype=np.int32)
+		sentence._tokens = None
+
+		sentence.dependencySources = np.asarray(dependencySources, dtype=np.int32)
+		sentence.dependencyTargets = np.asarray(dependencyTargets, dtype=np.int32)
+		sentence.dependencyTypeIDs = np.asarray(dependencyTypeIDs, dtype=np.int32)
+		sentence._dependencies = None
+		sentence._dependencyGraph = None
+		sentence._dependencyTree = None
+		sentence._dependencyDistances = None
+
+		tokenCount = len(sentence.wordIDs)
+		assert all( len(column) == tokenCount for column in [sentence.lemmaIDs,sentence.partofspeechIDs,sentence.startPositions,sentence.endPositions] ), "Token columns must all be the same length"
+		assert len(sentence.dependencySources) == len(sentence.dependencyTargets) == len(sentence.dependencyTypeIDs), "Dependency columns must all be the same length"
+
+		sentence.entityAnnotations = []
+		return sentence
+
+	@property
+	def tokens(self):
+		if self._tokens is None:
+			strings = self.vocabulary.strings
+			self._tokens = [ kindred.Token(strings[w],strings[l],strings[p],s,e) for w,l,p,s,e in zip(self.wordIDs.tolist(),self.lemmaIDs.tolist(),self.partofspeechIDs.tolist(),self.startPositions.tolist(),self.endPositions.tolist()) ]
+		return self._tokens
+
+	@tokens.setter
+	def tokens(self, tokens):
 		assert isinstance(tokens, list)
 		for token in tokens:
 			assert isinstance(token,kindred.Token)
 		
+		self.wordIDs = self.vocabulary.getIDs([ t.word for t in tokens ])
+		self.lemmaIDs = self.vocabulary.getIDs([ t.lemma for t in tokens ])
+		self.partofspeechIDs = self.vocabulary.getIDs([ t.partofspeech for t in tokens ])
+		self.startPositions = np.array([ t.startPos for t in tokens ], dtype=np.int32)
+		self.endPositions = np.array([ t.endPos for t in tokens ], dtype=np.int32)
+		self._tokens = tokens
+
+	@property
+	def dependencies(self):
+		if self._dependencies is None:
+			dependencyTypes = self.vocabulary.getStrings(self.dependencyTypeIDs)
+			self._dependencies = list(zip(self.dependencySources.tolist(),self.dependencyTargets.tolist(),dependencyTypes))
+		return self._dependencies
+
+	@dependencies.setter
+	def dependencies(self, dependencies):
 		# Check the format of the Dependencies
+		tokenCount = len(self.wordIDs)
 		dependencyErrorMsg = "Each dependency is expected to be a tuple of (tokenindex1,tokenindex2,dependency_type). Token index can be -1 to indicate an incoming edge."
 		assert isinstance(dependencies, list), dependencyErrorMsg
 		for dependency in dependencies:
@@ -45,15 +153,69 @@ class Sentence:
 			assert isinstance(dependency[0],int),dependencyErrorMsg
 			assert isinstance(dependency[1],int),dependencyErrorMsg
 			assert isinstance(dependency[2], six.string_types),dependencyErrorMsg
-			assert dependency[0] >= -1 and dependency[0] < len(tokens), dependencyErrorMsg
-			assert dependency[1] >= -1 and dependency[1] < len(tokens), dependencyErrorMsg
+			assert dependency[0] >= -1 and dependency[0] < tokenCount, dependencyErrorMsg
+			assert dependency[1] >= -1 and dependency[1] < tokenCount, dependencyErrorMsg
 		
-		self.text = text
-		self.tokens = tokens
-		self.dependencies = dependencies
-		self.sourceFilename = sourceFilename
+		self.dependencySources = np.array([ a for a,_,_ in dependencies ], dtype=np.int32)
+		self.dependencyTargets = np.array([ b for _,b,_ in dependencies ], dtype=np.int32)
+		self.dependencyTypeIDs = self.vocabulary.getIDs([ depType for _,_,depType in dependencies ])
+		self._dependencies = dependencies
+		self._dependencyGraph = None
+		self._dependencyTree = None
+		self._dependencyDistances = None
 		
-		self.entityAnnotations = []
+	_tokenColumns = ['wordIDs','lemmaIDs','partofspeechIDs','startPositions','endPositions']
+	_dependencyColumns = ['dependencySources','dependencyTargets','dependencyTypeIDs']
+	_vocabularyColumns = ['wordIDs','lemmaIDs','partofspeechIDs','dependencyTypeIDs']
+
+	def _useVocabulary(self, vocabulary):
+		# Renumber the vocabulary IDs for another vocabulary (adding any strings that it doesn't have yet)
+		if vocabulary is self.vocabulary:
+			return
+		newIDs = vocabulary.getIDs(self.vocabulary.strings)
+		for name in Sentence._vocabularyColumns:
+			setattr(self, name, newIDs[getattr(self, name)])
+		self.vocabulary = vocabulary
+
+	def __getstate__(self):
+		# The columns are pickled as two blocks of bytes (rather than many small arrays) and the tokens and dependencies are recreated from them when needed
+		state = dict(self.__dict__)
+
+		# Only the strings that the sentence uses are pickled (and its IDs renumbered to match) rather than the whole vocabulary that it may share with a corpus
+		vocabulary = state.pop('vocabulary')
+		usedIDs = np.unique(np.concatenate([ state[name] for name in Sentence._vocabularyColumns ]))
+		state['_strings'] = vocabulary.getStrings(usedIDs)
+		for name in Sentence._vocabularyColumns:
+			state[name] = np.searchsorted(usedIDs, state[name]).astype(np.int32)
+
+		state['_tokens'] = None
+		state['_dependencies'] = None
+		state['_dependencyGraph'] = None
+		state['_dependencyTree'] = None
+		state['_dependencyDistances'] = None
+		state['_tokenColumns'] = np.stack([ state.pop(c) for c in Sentence._tokenColumns ]).tobytes()
+		state['_dependencyColumns'] = np.stack([ state.pop(c) for c in Sentence._dependencyColumns ]).tobytes()
+		return state
+
+	def __setstate__(self, state):
+		if not '_tokenColumns' in state:
+			# Sentences pickled by older versions have their tokens and dependencies (and no vocabulary) so the columns are rebuilt from them
+			tokens,dependencies = state.pop('tokens'),state.pop('dependencies')
+			self.__dict__.update(state)
+			self.vocabulary = kindred.Vocabulary()
+			self.tokens = tokens
+			self.dependencies = dependencies
+			return
+
+		tokenColumns = np.frombuffer(state.pop('_tokenColumns'), dtype=np.int32).reshape(len(Sentence._tokenColumns),-1)
+		dependencyColumns = np.frombuffer(state.pop('_dependencyColumns'), dtype=np.int32).reshape(len(Sentence._dependencyColumns),-1)
+		self.vocabulary = kindred.Vocabulary()
+		self.vocabulary.getIDs(state.pop('_strings'))
+		self.__dict__.update(state)
+		for name,column in zip(Sentence._tokenColumns,tokenColumns):
+			setattr(self, name, column.copy())
+		for name,column in zip(Sentence._dependencyColumns,dependencyColumns):
+			setattr(self, name, column.copy())
 		
 	def addEntityAnnotation(self, entity, tokenIndices):
 		"""
@@ -68,22 +230,122 @@ class Sentence:
 		assert isinstance(entity, kindred.Entity)
 		assert isinstance(tokenIndices,list)
 		for l in tokenIndices:
-			assert l >= 0 and l < len(self.tokens), "Entity location must be an index of one of the tokens"
+			assert l >= 0 and l < len(self.wordIDs), "Entity location must be an index of one of the tokens"
 		self.entityAnnotations.append( (entity,tokenIndices) )
 	
 	def __str__(self):
-		tokenWords = [ t.word for t in self.tokens ]
+		tokenWords = self.vocabulary.getStrings(self.wordIDs)
 		return " ".join(tokenWords)
 	
 	def __repr__(self):
 		return self.__str__()
 	
-	def extractMinSubgraphContainingNodes(self, minSet):
+	def getDependencyGraph(self):
+		"""
+		Get the (undirected) dependency graph of the sentence. It is built the first time it is needed and reused until the dependencies are changed, so it should not be modified.
+
+		:return: Graph with tokens indices as nodes and the dependency type stored for each edge (as dependencyType)
+		:rtype: networkx.Graph
+		"""
+
+		if self._dependencyGraph is None:
+			G = nx.Graph()
+			dependencyTypes = self.vocabulary.getStrings(self.dependencyTypeIDs)
+			for a,b,depType in zip(self.dependencySources.tolist(),self.dependencyTargets.tolist(),dependencyTypes):
+				G.add_edge(a,b,dependencyType=depType)
+			self._dependencyGraph = G
+		return self._dependencyGraph
+
+	def getDependencyDistances(self, maxSize=64*1024**2):
+		"""
+		Get the number of dependency edges on the shortest path between every pair of tokens. The distances are found with a breadth-first search from each token the first time they are needed and reused until the dependencies are changed. Dependencies with the incoming edge (-1) are not used.
+
+		:param maxSize: Maximum size (in bytes) of the matrix. None is returned for longer sentences.
+		:type maxSize: int
+		:return: Matrix (# tokens by # tokens) of distances with -1 for tokens that are not connected, or None if the sentence is too long
+		:rtype: numpy.ndarray of int16
+		"""
+
+		tokenCount = len(self.wordIDs)
+		if tokenCount*tokenCount*np.dtype(np.int16).itemsize > maxSize or tokenCount > np.iinfo(np.int16).max:
+			return None
+
+		if self._dependencyDistances is None:
+			neighbours = [ [] for _ in range(tokenCount) ]
+			for a,b in zip(self.dependencySources.tolist(),self.dependencyTargets.tolist()):
+				if a != b and a >= 0 and b >= 0:
+					neighbours[a].append(b)
+					neighbours[b].append(a)
+
+			distances = np.full((tokenCount,tokenCount), -1, dtype=np.int16)
+			for source in range(tokenCount):
+				row = [-1] * tokenCount
+				row[source] = 0
+				frontier = [source]
+				distance = 0
+				while frontier:
+					distance += 1
+					nextFrontier = []
+					for node in frontier:
+						for neighbour in neighbours[node]:
+							if row[neighbour] == -1:
+								row[neighbour] = distance
+								nextFrontier.append(neighbour)
+					frontier = nextFrontier
+				distances[source] = row
+			self._dependencyDistances = distances
+
+		return self._dependencyDistances
+
+	def _getDependencyTree(self):
+		# Parent, depth and component (identified by its root) of every node in the undirected dependency graph, along with the dependency type of each edge. This is None if the graph is not a forest (i.e. it has a cycle).
+		if self._dependencyTree is None:
+			dependencyTypes = self.vocabulary.getStrings(self.dependencyTypeIDs)
+			adjacency = {}
+			edgeTypes = {}
+			for a,b,depType in zip(self.dependencySources.tolist(),self.dependencyTargets.tolist(),dependencyTypes):
+				adjacency.setdefault(a,[])
+				adjacency.setdefault(b,[])
+				if a == b:
+					continue
+				edge = (min(a,b),max(a,b))
+				if not edge in edgeTypes:
+					adjacency[a].append(b)
+					adjacency[b].append(a)
+				# As with the networkx graph, a repeated edge takes the last dependency type
+				edgeTypes[edge] = depType
+
+			parent,depth,component = {},{},{}
+			isForest = True
+			for root in adjacency:
+				if root in parent:
+					continue
+				parent[root],depth[root],component[root] = None,0,root
+				stack = [root]
+				while stack and isForest:
+					node = stack.pop()
+					for neighbour in adjacency[node]:
+						if neighbour == parent[node]:
+							continue
+						elif neighbour in parent:
+							isForest = False
+							break
+						parent[neighbour],depth[neighbour],component[neighbour] = node,depth[node]+1,root
+						stack.append(neighbour)
+				if not isForest:
+					break
+
+			self._dependencyTree = (parent,depth,component,edgeTypes) if isForest else False
+		return self._dependencyTree if self._dependencyTree else None
+
+	def extractMinSubgraphContainingNodes(self, minSet, method='tree'):
 		"""
 		Find the minimum subgraph of the dependency graph that contains the provided set of nodes. Useful for finding dependency-path like structures
 		
 		:param minSet: List of token indices
+		:param method: How to find the subgraph. 'tree' uses parent/depth information and lowest common ancestors when the dependency graph is a tree (or forest), as it is for parses from Spacy, and falls back to 'networkx' otherwise. 'networkx' finds the shortest paths between every pair of nodes and then a minimum spanning tree of them. Both give the same result.
 		:type minSet: List of ints
+		:type method: str
 		:return: All the nodes and edges in the minimal subgraph
 		:rtype: Tuple of nodes,edges where nodes is a list of token indices, and edges are the associated dependency edges between those tokens
 		"""
@@ -92,10 +354,15 @@ class Sentence:
 		for i in minSet:
 			assert isinstance(i, int)
 			assert i >= 0
-			assert i < len(self.tokens)
-		G1 = nx.Graph()
-		for a,b,depType in self.dependencies:
-			G1.add_edge(a,b,dependencyType=depType)
+			assert i < len(self.wordIDs)
+		assert method in ['tree','networkx'], "method must be 'tree' or 'networkx'"
+
+		if method == 'tree':
+			tree = self._getDependencyTree()
+			if tree is not None:
+				return self._extractMinSubtreeContainingNodes(minSet, tree)
+
+		G1 = self.getDependencyGraph()
 
 		G2 = nx.Graph()
 		paths = {}
@@ -129,3 +396,50 @@ class Sentence:
 
 		return nodes,allEdges
 
+	def _extractMinSubtreeContainingNodes(self, minSet, tree):
+		# In a tree, the union of the paths used by the networkx method is the smallest subtree containing the nodes. This is found by walking up from each node to their lowest common ancestor.
+		parent,depth,component,edgeTypes = tree
+
+		minSet = sorted(list(set(minSet)))
+		setCount1 = len(minSet)
+		minSet = [ a for a in minSet if a in parent ]
+		setCount2 = len(minSet)
+		if setCount1 != setCount2:
+			sys.stderr.write("WARNING. %d node(s) not found in dependency graph!\n" % (setCount1-setCount2))
+
+		nodesByComponent = defaultdict(list)
+		for a in minSet:
+			nodesByComponent[component[a]].append(a)
+		if len(nodesByComponent) > 1:
+			for a,b in itertools.combinations(minSet,2):
+				if component[a] != component[b]:
+					sys.stderr.write("WARNING. No path found between nodes %d and %d!\n" % (a,b))
+
+		nodes = set()
+		allEdges = set()
+		for componentNodes in nodesByComponent.values():
+			if len(componentNodes) < 2:
+				continue
+
+			ancestor = componentNodes[0]
+			for b in componentNodes[1:]:
+				a = ancestor
+				while depth[a] > depth[b]:
+					a = parent[a]
+				while depth[b] > depth[a]:
+					b = parent[b]
+				while a != b:
+					a,b = parent[a],parent[b]
+				ancestor = a
+
+			subtree = set([ancestor])
+			for a in componentNodes:
+				while not a in subtree:
+					subtree.add(a)
+					b = parent[a]
+					edge = (min(a,b),max(a,b))
+					allEdges.add(edge + (edgeTypes[edge],))
+					a = b
+			nodes.update(subtree)
+
+		return nodes,allEdges
@@ -9,6 +9,8 @@ class Token:
 	:ivar startPos: Start position of token in document text (note: not the sentence text)
 	:ivar endPos: End position of token in document text (note: not the sentence text)
 	"""
+
+	__slots__ = ['word','lemma','partofspeech','startPos','endPos']
 	
 	def __init__(self,word,lemma,partofspeech,startPos,endPos):
 		"""
@@ -32,6 +34,13 @@ class Token:
 		self.startPos = startPos
 		self.endPos = endPos
 
+	def __setstate__(self, state):
+		# Tokens pickled before __slots__ was used have their attributes in a dictionary rather than a (dictionary,slots) tuple
+		if isinstance(state, tuple):
+			state = state[1]
+		for name,value in state.items():
+			setattr(self, name, value)
+
 	def __str__(self):
 		return self.word
 		
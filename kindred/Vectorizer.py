@@ -7,7 +7,39 @@ import itertools
 
 import kindred
 
-def _doEntityTypes(candidates,entityCount):
+class _SubgraphMemo:
+	# Minimal dependency subgraphs for sets of token indices in each sentence. The dependency features (and the candidates with the same entities in a different order) use the same subgraphs, so they are only extracted once for each chunk of candidates.
+	def __init__(self):
+		self.subgraphs = {}
+		self.hits = 0
+		self.misses = 0
+
+	def get(self,sentence,tokenIndices):
+		sentenceSubgraphs = self.subgraphs.setdefault(sentence,{})
+		key = frozenset(tokenIndices)
+		subgraph = sentenceSubgraphs.get(key)
+		if subgraph is None:
+			subgraph = sentence.extractMinSubgraphContainingNodes(sorted(key))
+			sentenceSubgraphs[key] = subgraph
+			self.misses += 1
+		else:
+			self.hits += 1
+		return subgraph
+
+def _iterChunks(candidates,chunkSize=10000):
+	# A table of candidates is turned into candidate relations a chunk at a time so that they aren't all in memory at once
+	if isinstance(candidates,list):
+		yield candidates
+		return
+
+	iterator = iter(candidates)
+	while True:
+		chunk = list(itertools.islice(iterator,chunkSize))
+		if len(chunk) == 0:
+			return
+		yield chunk
+
+def _doEntityTypes(candidates,entityCount,subgraphMemo):
 	data = []
 	for cr in candidates:
 		assert isinstance(cr,kindred.CandidateRelation)
@@ -19,12 +51,13 @@ def _doEntityTypes(candidates,entityCount):
 		data.append(tokenInfo)
 	return data
 
-def _doUnigramsBetweenEntities(candidates,entityCount):
+def _doUnigramsBetweenEntities(candidates,entityCount,subgraphMemo):
 	data = []	
 	for cr in candidates:
 		assert isinstance(cr,kindred.CandidateRelation)
 		
 		sentence = cr.sentence
+		vocabulary = sentence.vocabulary
 		dataForThisCR = Counter()
 		entityCount = len(cr.entities)
 		entityToTokenIndices = { e:tokenIndices for e,tokenIndices in cr.sentence.entityAnnotations }
@@ -38,19 +71,20 @@ def _doUnigramsBetweenEntities(candidates,entityCount):
 			else:
 				startPos,endPos = max(pos2)+1,min(pos1)
 
-			tokenData = [ sentence.tokens[i].word.lower() for i in range(startPos,endPos) ]
+			# Count the lowercased word IDs so that each distinct word is only formatted once
+			tokenData = Counter(vocabulary.getLowercaseIDs(sentence.wordIDs[startPos:endPos]).tolist())
 
 			basename = u"ngrams_betweenentities"
 			if entityCount > 2:
 				basename = u"ngrams_betweenentities_%d_%d" % (e1,e2)
 
-			for t in tokenData:
-				dataForThisCR[u"%s_%s" % (basename,t)] += 1
+			for wordID,count in tokenData.items():
+				dataForThisCR[u"%s_%s" % (basename,vocabulary.strings[wordID])] += count
 		data.append(dataForThisCR)
 
 	return data
 
-def _doDependencyPathEdges(candidates,entityCount):
+def _doDependencyPathEdges(candidates,entityCount,subgraphMemo):
 	data = []	
 	for cr in candidates:
 		assert isinstance(cr,kindred.CandidateRelation)
@@ -69,14 +103,14 @@ def _doDependencyPathEdges(candidates,entityCount):
 			if entityCount > 2:
 				basename = u"dependencypathelements_%d_%d" % (e1,e2)
 
-			nodes,edges = sentence.extractMinSubgraphContainingNodes(combinedPos)
+			nodes,edges = subgraphMemo.get(sentence,combinedPos)
 			for a,b,dependencyType in edges:
 				dataForThisCR[u"%s_%s" % (basename,dependencyType)] += 1
 		data.append(dataForThisCR)
 
 	return data
 
-def _doDependencyPathEdgesNearEntities(candidates,entityCount):
+def _doDependencyPathEdgesNearEntities(candidates,entityCount,subgraphMemo):
 	data = []	
 	for cr in candidates:
 		assert isinstance(cr,kindred.CandidateRelation)
@@ -89,7 +123,7 @@ def _doDependencyPathEdgesNearEntities(candidates,entityCount):
 		for e in cr.entities:
 			allEntityLocs += entityToTokenIndices[e]
 		
-		nodes,edges = sentence.extractMinSubgraphContainingNodes(allEntityLocs)
+		nodes,edges = subgraphMemo.get(sentence,allEntityLocs)
 		for i,e in enumerate(cr.entities):
 			pos = entityToTokenIndices[e]
 
@@ -100,21 +134,24 @@ def _doDependencyPathEdgesNearEntities(candidates,entityCount):
 
 	return data
 
-def _doBigrams(candidates,entityCount):
+def _doBigrams(candidates,entityCount,subgraphMemo):
 	data = []
+	sentenceBigrams = {}
 	for cr in candidates:
 		assert isinstance(cr,kindred.CandidateRelation)
 		
 		sentence = cr.sentence
-		dataForThisCR = Counter()
 
-		for _ in cr.entities:
-			startPos = 0
-			endPos = len(sentence.tokens)
+		# The bigrams only depend on the sentence so they are counted once for all its candidates
+		if not sentence in sentenceBigrams:
+			vocabulary = sentence.vocabulary
+			wordIDs = vocabulary.getLowercaseIDs(sentence.wordIDs).tolist()
+			bigramCounts = Counter(zip(wordIDs[:-1],wordIDs[1:]))
+			sentenceBigrams[sentence] = { u"bigrams_%s_%s" % (vocabulary.strings[a],vocabulary.strings[b]):count for (a,b),count in bigramCounts.items() }
 
-			tokenData = [ (sentence.tokens[i].word.lower(),sentence.tokens[i+1].word.lower()) for i in range(startPos,endPos-1) ]
-			for t in tokenData:
-				dataForThisCR[u"bigrams_%s_%s" % t] += 1
+		dataForThisCR = Counter()
+		for _ in cr.entities:
+			dataForThisCR.update(sentenceBigrams[sentence])
 		data.append(dataForThisCR)
 
 	return data
@@ -129,6 +166,8 @@ class Vectorizer:
 	:ivar fitted: Whether it has been fit on data first (before transforming).
 	:ivar dictVectorizers: Dictionary vectorizers used for each feature
 	:ivar tfidfTransformers: TFIDF transformers used for each feature (if appropriate and selected)
+	:ivar subgraphMemoHits: Number of times a minimal dependency subgraph was reused (within one chunk of candidates in a call to fit_transform or transform) instead of being extracted again
+	:ivar subgraphMemoMisses: Number of minimal dependency subgraphs that were extracted
 	"""
 	
 	def __init__(self,entityCount=2,featureChoice=None,tfidf=True):
@@ -165,13 +204,29 @@ class Vectorizer:
 		self.dictVectorizers = {}
 		self.tfidfTransformers = {}
 
+		self.subgraphMemoHits = 0
+		self.subgraphMemoMisses = 0
+
 	def _registerFunctions(self):
 		self.featureInfo = {}
-		self.featureInfo['entityTypes'] = {'func':_doEntityTypes,'never_tfidf':True}
-		self.featureInfo['unigramsBetweenEntities'] = {'func':_doUnigramsBetweenEntities,'never_tfidf':False}
-		self.featureInfo['bigrams'] = {'func':_doBigrams,'never_tfidf':False}
-		self.featureInfo['dependencyPathEdges'] = {'func':_doDependencyPathEdges,'never_tfidf':True}
-		self.featureInfo['dependencyPathEdgesNearEntities'] = {'func':_doDependencyPathEdgesNearEntities,'never_tfidf':True}
+		self.featureInfo['entityTypes'] = {'func':_doEntityTypes,'never_tfidf':True,'annotations':[]}
+		self.featureInfo['unigramsBetweenEntities'] = {'func':_doUnigramsBetweenEntities,'never_tfidf':False,'annotations':[]}
+		self.featureInfo['bigrams'] = {'func':_doBigrams,'never_tfidf':False,'annotations':[]}
+		self.featureInfo['dependencyPathEdges'] = {'func':_doDependencyPathEdges,'never_tfidf':True,'annotations':['dependencies']}
+		self.featureInfo['dependencyPathEdgesNearEntities'] = {'func':_doDependencyPathEdgesNearEntities,'never_tfidf':True,'annotations':['dependencies']}
+
+	def getRequiredAnnotations(self):
+		"""
+		Get the parser annotations (beyond tokens and sentences) that the chosen features make use of. This can be passed to a :class:`kindred.Parser` so that it doesn't run unnecessary parts of the Spacy pipeline.
+
+		:return: List of annotations (a subset of 'lemmas', 'partsofspeech' and 'dependencies')
+		:rtype: List of str
+		"""
+
+		annotations = set()
+		for feature in self.chosenFeatures:
+			annotations.update(self.featureInfo[feature]['annotations'])
+		return sorted(list(annotations))
 				
 	def getFeatureNames(self):
 		"""
@@ -189,17 +244,26 @@ class Vectorizer:
 		return featureNames
 		
 	def _vectorize(self,candidates,fit):
-		assert isinstance(candidates,list)
+		assert isinstance(candidates,(list,kindred.CandidateTable))
 		assert len(candidates) > 0
-		for c in candidates:
-			assert isinstance(c,kindred.CandidateRelation)
 			
-		matrices = []
 		for feature in self.chosenFeatures:
 			assert feature in self.featureInfo.keys()
-			featureFunction = self.featureInfo[feature]['func']
+
+		# All features are extracted for a chunk before the next one, so the dependency features can share subgraphs while only one chunk's subgraphs are kept
+		dataByFeature = { feature:[] for feature in self.chosenFeatures }
+		for chunk in _iterChunks(candidates):
+			subgraphMemo = _SubgraphMemo()
+			for feature in self.chosenFeatures:
+				featureFunction = self.featureInfo[feature]['func']
+				dataByFeature[feature] += featureFunction(chunk,self.entityCount,subgraphMemo)
+			self.subgraphMemoHits += subgraphMemo.hits
+			self.subgraphMemoMisses += subgraphMemo.misses
+
+		matrices = []
+		for feature in self.chosenFeatures:
 			never_tfidf = self.featureInfo[feature]['never_tfidf']
-			data = featureFunction(candidates,self.entityCount)
+			data = dataByFeature[feature]
 			notEmpty = any( len(d)>0 for d in data )
 			if fit:
 				if notEmpty:
@@ -226,15 +290,16 @@ class Vectorizer:
 		Fit the vectorizer to a list of candidate relations found in a corpus and vectorize them to generate the feature matrix.
 		
 		:param candidates: Relation candidates to vectorize
-		:type candidates: list of kindred.CandidateRelation
+		:type candidates: list of kindred.CandidateRelation or kindred.CandidateTable
 		:return: Feature matrix (# rows = number of candidate relations, # cols = number of features)
 		:rtype: scipy.sparse.csr.csr_matrix
 		"""
 		assert self.fitted == False
-		assert isinstance(candidates,list)
+		assert isinstance(candidates,(list,kindred.CandidateTable))
 		assert len(candidates) > 0
-		for c in candidates:
-			assert isinstance(c,kindred.CandidateRelation)
+		if isinstance(candidates,list):
+			for c in candidates:
+				assert isinstance(c,kindred.CandidateRelation)
 		self.fitted = True
 		return self._vectorize(candidates,True)
 	
@@ -243,15 +308,16 @@ class Vectorizer:
 		Vectorize the candidate relations to generate the feature matrix. Must already have been fit.
 		
 		:param candidates: Relation candidates to vectorize
-		:type candidates: list of kindred.CandidateRelation
+		:type candidates: list of kindred.CandidateRelation or kindred.CandidateTable
 		:return: Feature matrix (# rows = number of candidate relations, # cols = number of features)
 		:rtype: scipy.sparse.csr.csr_matrix
 		"""
 		assert self.fitted == True
-		assert isinstance(candidates,list)
+		assert isinstance(candidates,(list,kindred.CandidateTable))
 		assert len(candidates) > 0
-		for c in candidates:
-			assert isinstance(c,kindred.CandidateRelation)
+		if isinstance(candidates,list):
+			for c in candidates:
+				assert isinstance(c,kindred.CandidateRelation)
 		return self._vectorize(candidates,False)
 		
 		
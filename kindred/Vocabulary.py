@@ -0,0 +1,106 @@
+import numpy as np
+import six
+
+class Vocabulary:
+	"""
+	Table of interned strings (e.g. words, lemmas, parts-of-speech and dependency types). Each distinct string is stored once and is referred to by an integer ID.
+
+	:ivar strings: List of the strings in the vocabulary, indexed by their ID
+	"""
+
+	def __init__(self):
+		"""
+		Constructor for an empty Vocabulary
+		"""
+
+		self.strings = []
+		self._stringToID = {}
+		self._lowercaseIDs = np.zeros(0, dtype=np.int32)
+
+	def getID(self,string):
+		"""
+		Get the ID of a string, adding it to the vocabulary if it isn't already in it
+
+		:param string: String to look up
+		:type string: str
+		:return: ID of the string
+		:rtype: int
+		"""
+
+		stringID = self._stringToID.get(string)
+		if stringID is None:
+			stringID = len(self.strings)
+			self.strings.append(string)
+			self._stringToID[string] = stringID
+		return stringID
+
+	def getIDs(self,strings):
+		"""
+		Get the IDs of a list of strings, adding any that aren't already in the vocabulary
+
+		:param strings: Strings to look up
+		:type strings: list of str
+		:return: IDs of the strings
+		:rtype: numpy.ndarray
+		"""
+
+		return np.array([ self.getID(s) for s in strings ], dtype=np.int32)
+
+	def getString(self,stringID):
+		"""
+		Get the string with a specific ID
+
+		:param stringID: ID of the string
+		:type stringID: int
+		:return: The string
+		:rtype: str
+		"""
+
+		return self.strings[stringID]
+
+	def getStrings(self,stringIDs):
+		"""
+		Get the strings for a list (or array) of IDs
+
+		:param stringIDs: IDs of the strings
+		:type stringIDs: list or numpy.ndarray of ints
+		:return: The strings
+		:rtype: list of str
+		"""
+
+		if isinstance(stringIDs,np.ndarray):
+			stringIDs = stringIDs.tolist()
+		strings = self.strings
+		return [ strings[i] for i in stringIDs ]
+
+	def getLowercaseIDs(self,stringIDs):
+		"""
+		Get the IDs of the lowercased versions of strings (adding any that aren't already in the vocabulary). Each string is only lowercased once.
+
+		:param stringIDs: IDs of the strings
+		:type stringIDs: list or numpy.ndarray of ints
+		:return: IDs of the lowercased strings
+		:rtype: numpy.ndarray
+		"""
+
+		if len(self._lowercaseIDs) < len(self.strings):
+			lowercaseIDs = self._lowercaseIDs.tolist()
+			# Lowercasing can add new strings which also need a lowercase ID
+			while len(lowercaseIDs) < len(self.strings):
+				s = self.strings[len(lowercaseIDs)]
+				lowercaseIDs.append(self.getID(s.lower()) if isinstance(s, six.string_types) else len(lowercaseIDs))
+			self._lowercaseIDs = np.array(lowercaseIDs, dtype=np.int32)
+
+		return self._lowercaseIDs[np.asarray(stringIDs, dtype=np.int32)]
+
+	def __len__(self):
+		return len(self.strings)
+
+	def __getstate__(self):
+		# The lookup table is rebuilt on unpickling so only the strings are stored
+		return {'strings':self.strings}
+
+	def __setstate__(self,state):
+		self.strings = state['strings']
+		self._stringToID = { s:i for i,s in enumerate(self.strings) }
+		self._lowercaseIDs = np.zeros(0, dtype=np.int32)
@@ -5,8 +5,10 @@ from kindred.Document import Document
 from kindred.Entity import Entity
 from kindred.Relation import Relation
 from kindred.CandidateRelation import CandidateRelation
+from kindred.CandidateTable import CandidateTable
 from kindred.Token import Token
 from kindred.Sentence import Sentence
+from kindred.Vocabulary import Vocabulary
 
 # Components
 from kindred.Parser import Parser
@@ -2,12 +2,15 @@ import sys
 import codecs
 import os
 import json
+import gzip
 import re
 from collections import OrderedDict
 
 from xml.dom import minidom
 
 import kindred
+from kindred.parseFunctions import addCompactSentencesToDocument
+from kindred.saveFunctions import getParseSidecarPath,getParseSidecarKey,parseSidecarVersion
 
 import bioc
 from future.utils import native
@@ -356,6 +359,23 @@ def loadDataFromBioC(filename,ignoreEntities=[]):
 	corpus.documents = parsed
 	return corpus
 
+def loadParseSidecar(corpus,path):
+	with gzip.open(path,'rt',encoding='utf8') as f:
+		sidecar = json.load(f)
+
+	# A parse saved in an unknown format (e.g. by a newer version of Kindred) is ignored and the corpus is left unparsed
+	if sidecar.get('version') != parseSidecarVersion:
+		return
+	parses = sidecar['documents']
+
+	# Only use the saved parse if it covers every document (e.g. the text hasn't been edited since)
+	keys = [ getParseSidecarKey(doc.text) for doc in corpus.documents ]
+	if not all( key in parses for key in keys ):
+		return
+
+	for doc,key in zip(corpus.documents,keys):
+		addCompactSentencesToDocument(doc,parses[key]['sentences'],corpus.vocabulary,annotations=parses[key]['annotations'])
+
 def iterLoad(dataFormat,path,corpusSizeCutoff=500):
 	"""
 	Iteratively load sections of a (presumably large) corpus. This will create a generator that provides kindred.Corpus objects that are subsets of the larger corpus. This should be used to lower the memory requirements (so that the entire file doesn't need to be loaded into memory at one time).
@@ -393,7 +413,7 @@ def iterLoad(dataFormat,path,corpusSizeCutoff=500):
 	
 def load(dataFormat,path,ignoreEntities=[],ignoreComplexRelations=True):
 	"""
-	Load a corpus from a variety of formats. If path is a directory, it will try to load all files of the corresponding data type. For standoff format, it will use any associated annotations files (with suffixes .ann, .a1 or .a2)
+	Load a corpus from a variety of formats. If path is a directory, it will try to load all files of the corresponding data type. For standoff format, it will use any associated annotations files (with suffixes .ann, .a1 or .a2). If the corpus was saved with its parse (see the includeParse parameter of :func:`kindred.save`), the parse is loaded too and the corpus does not need to be parsed again
 	
 	:param dataFormat: Format of the data files to load ('standoff','biocxml','pubannotation','simpletag')
 	:param path: Path to data. Can be directory or an individual file. Should be the txt file for standoff.
@@ -457,6 +477,10 @@ def load(dataFormat,path,ignoreEntities=[],ignoreComplexRelations=True):
 		doc.sourceFilename = os.path.basename(path)
 		corpus.addDocument(doc)
 
+	sidecarPath = getParseSidecarPath(path)
+	if os.path.isfile(sidecarPath):
+		loadParseSidecar(corpus,sidecarPath)
+
 	return corpus
 			
 
@@ -57,7 +57,7 @@ def manuallyAnnotate(corpus,candidateRelations):
 				crCounter += 1
 
 				sentence = candidateRelation.sentence
-				sentenceStart = sentence.tokens[0].startPos
+				sentenceStart = int(sentence.startPositions[0])
 
 				e1,e2 = candidateRelation.entities
 
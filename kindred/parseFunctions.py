@@ -0,0 +1,110 @@
+import kindred
+from collections import defaultdict
+
+class _EntitySweep:
+	# Finds the entities overlapping each token by sweeping through the sorted entity spans. Sentences must be located in document order so that the whole document is a single linear pass.
+	def __init__(self,entities):
+		spans = set()
+		for e in entities:
+			for a,b in e.position:
+				if b > a:
+					spans.add((a,b,e.entityID))
+		self.spans = sorted(spans)
+		self.nextSpan = 0
+		self.activeSpans = []
+
+	def locate(self,startPositions,endPositions):
+		entityIDsToTokenLocs = defaultdict(list)
+		for i,(start,end) in enumerate(zip(startPositions,endPositions)):
+			if end <= start:
+				continue
+
+			while self.nextSpan < len(self.spans) and self.spans[self.nextSpan][0] < end:
+				self.activeSpans.append(self.spans[self.nextSpan])
+				self.nextSpan += 1
+
+			if self.activeSpans:
+				# Spans that end before this token can't overlap any later token either
+				self.activeSpans = [ span for span in self.activeSpans if span[1] > start ]
+				for _,_,entityID in self.activeSpans:
+					entityIDsToTokenLocs[entityID].append(i)
+
+		return entityIDsToTokenLocs
+
+class _EntityIntervalTree:
+	# Original approach that queries an interval tree of the entity spans for every token
+	def __init__(self,entities):
+		from intervaltree import IntervalTree
+
+		self.denotationTree = IntervalTree()
+		for e in entities:
+			for a,b in e.position:
+				if b > a:
+					self.denotationTree[a:b] = e.entityID
+
+	def locate(self,startPositions,endPositions):
+		# Ignore DeprecationWarning from SortedDict which is inside IntervalTree
+		import warnings
+		warnings.filterwarnings("ignore", category=DeprecationWarning)
+
+		entityIDsToTokenLocs = defaultdict(list)
+		for i,(start,end) in enumerate(zip(startPositions,endPositions)):
+			entitiesOverlappingWithToken = self.denotationTree[start:end]
+			for interval in entitiesOverlappingWithToken:
+				entityID = interval.data
+				entityIDsToTokenLocs[entityID].append(i)
+		return entityIDsToTokenLocs
+
+def addCompactSentencesToDocument(d,compactSentences,vocabulary,entityMapping='sweep',annotations=None):
+	# Build the sentences of a document from compact sentences (one tuple of words, lemmas, parts-of-speech, start and end positions, heads and dependency types per sentence) and locate its entities in them
+	entityIDsToEntities = { entity.entityID:entity for entity in d.entities }
+	assert len(entityIDsToEntities) == len(d.entities), "Each entity in a document must have a different entityID"
+
+	# Entity annotations are kept in the order of the document's entities (as entity IDs depend on the process that created them)
+	entityIDsToOrder = { entity.entityID:i for i,entity in enumerate(d.entities) }
+
+	if entityMapping == 'sweep':
+		entityLocator = _EntitySweep(d.entities)
+	else:
+		entityLocator = _EntityIntervalTree(d.entities)
+
+	for words,lemmas,partsofspeech,startPositions,endPositions,heads,dependencyTypes in compactSentences:
+		sentenceStart = startPositions[0]
+		sentenceEnd = endPositions[-1]
+		sentenceTxt = d.text[sentenceStart:sentenceEnd]
+
+		# Each token has one dependency from its head (if the dependencies were parsed)
+		dependencyTargets = list(range(len(heads)))
+
+		entityIDsToTokenLocs = entityLocator.locate(startPositions,endPositions)
+
+		sentence = kindred.Sentence.fromColumns(sentenceTxt, vocabulary, vocabulary.getIDs(words), vocabulary.getIDs(lemmas), vocabulary.getIDs(partsofspeech), startPositions, endPositions, heads, dependencyTargets, vocabulary.getIDs(dependencyTypes), d.sourceFilename)
+
+		# Let's gather up the information about the "known" entities in the sentence
+		for entityID,entityLocs in sorted(entityIDsToTokenLocs.items(), key=lambda item : entityIDsToOrder[item[0]]):
+			# Get the entity associated with this ID
+			e = entityIDsToEntities[entityID]
+			sentence.addEntityAnnotation(e,entityLocs)
+
+		d.addSentence(sentence)
+
+	d.parsed = True
+	d.parsedAnnotations = annotations
+
+def compactSentencesOfDocument(d):
+	# The reverse of addCompactSentencesToDocument, used to store the parse of an already parsed document
+	compactSentences = []
+	for sentence in d.sentences:
+		words = sentence.vocabulary.getStrings(sentence.wordIDs)
+		lemmas = sentence.vocabulary.getStrings(sentence.lemmaIDs)
+		partsofspeech = sentence.vocabulary.getStrings(sentence.partofspeechIDs)
+		startPositions = sentence.startPositions.tolist()
+		endPositions = sentence.endPositions.tolist()
+
+		dependencies = sorted(sentence.dependencies, key=lambda dep : dep[1])
+		assert [ i for _,i,_ in dependencies ] in [ [], list(range(len(words))) ], "Expected one dependency to each token (as created by kindred.Parser)"
+		heads = [ head for head,_,_ in dependencies ]
+		dependencyTypes = [ depName for _,_,depName in dependencies ]
+
+		compactSentences.append((words,lemmas,partsofspeech,startPositions,endPositions,heads,dependencyTypes))
+	return compactSentences
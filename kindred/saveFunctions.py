@@ -1,8 +1,12 @@
 import os
 import codecs
+import itertools
 import json
+import gzip
+import hashlib
 import csv
 import kindred
+from kindred.parseFunctions import compactSentencesOfDocument
 import bioc
 import six
 
@@ -25,6 +29,10 @@ def convertKindredCorpusToBioCCollection(corpus):
         passage.offset = 0
         biocDoc.add_passage(passage)
 
+        # Entities without a source ID are numbered within the document (skipping any IDs already used) so that the output is reproducible
+        sourceEntityIDs = set(str(e.sourceEntityID) for e in kdoc.entities if e.sourceEntityID is not None)
+        generatedEntityIDs = (str(i) for i in itertools.count(1) if not str(i) in sourceEntityIDs)
+
         seenEntityIDs = set()
         kindredID2BiocID = {}
         for e in kdoc.entities:
@@ -36,7 +44,7 @@ def convertKindredCorpusToBioCCollection(corpus):
             a.infons.update(e.metadata)
 
             if e.sourceEntityID is None:
-                a.id = str(e.entityID)
+                a.id = next(generatedEntityIDs)
             else:
                 a.id = str(e.sourceEntityID)
 
@@ -196,16 +204,46 @@ def saveCorpusToCSVFormat(corpus, path):
         dict_writer.writerows(csv_annotations)
 
 
-def save(corpus, dataFormat, path):
+# Stores the compact sentences of each document and the annotations they were parsed with
+parseSidecarVersion = 1
+
+
+def getParseSidecarPath(path):
+    if os.path.isdir(path):
+        return os.path.join(path, 'kindred.parse.json.gz')
+    else:
+        return path + '.parse.json.gz'
+
+
+def getParseSidecarKey(text):
+    return hashlib.sha256(text.encode('utf8')).hexdigest()
+
+
+def saveParseSidecar(corpus, path):
+    assert isinstance(corpus, kindred.Corpus)
+    assert all(doc.parsed for doc in corpus.documents), "Corpus must be parsed before its parse can be saved"
+
+    # Documents are matched by their text so that the parse survives any reordering by the loaders
+    parses = {}
+    for doc in corpus.documents:
+        parses[getParseSidecarKey(doc.text)] = {'annotations': doc.parsedAnnotations, 'sentences': compactSentencesOfDocument(doc)}
+
+    with gzip.open(path, 'wt', encoding='utf8') as f:
+        json.dump({'version': parseSidecarVersion, 'documents': parses}, f)
+
+
+def save(corpus, dataFormat, path, includeParse=False):
     """
     Save a corpus to a directory
 
     :param corpus: The corpus of documents to save
     :param dataFormat: Format of data to save (only 'standoff', 'biocxml', 'pubannotation' and 'csv' are supported currently)
     :param path: Path where corpus should be saved. Must be an existing directory for 'standoff'.
+    :param includeParse: Whether to also save the parse (tokens, lemmas, parts-of-speech, dependencies and sentence boundaries) of a parsed corpus in a compressed file next to the corpus, so that :func:`kindred.load` can restore it without parsing again
     :type corpus: kindred.Corpus
     :type dataFormat: str
     :type path: str
+    :type includeParse: bool
     """
 
     assert dataFormat in ['standoff', 'biocxml', 'pubannotation', 'csv']
@@ -242,4 +280,6 @@ def save(corpus, dataFormat, path):
 
         saveCorpusToCSVFormat(corpus, path)
 
+    if includeParse:
+        saveParseSidecar(corpus, getParseSidecarPath(path))
 
@@ -1,4 +1,6 @@
 import kindred
+import itertools
+import pickle
 
 from kindred.datageneration import generateData,generateTestData
 	
@@ -98,6 +100,129 @@ def test_candidatebuilder_triple():
 	assert candidateRelations[4].knownTypesAndArgNames == []
 	assert candidateRelations[5].knownTypesAndArgNames == []
 
+def test_candidatebuilder_iterBuild():
+	text = '<drug id="1">Erlotinib</drug> is a common treatment for <cancer id="2">NSCLC</cancer> which targets <gene id="3">EGFR</gene>. <drug id="4">Aspirin</drug> is the main cause of <disease id="5">boneitis</disease>. <relation type="treats" subj="1" obj="2" />'
+
+	corpus = kindred.Corpus(text,loadFromSimpleTag=True)
+
+	parser = kindred.Parser()
+	parser.parse(corpus)
+
+	candidateBuilder = kindred.CandidateBuilder()
+	candidateRelations = candidateBuilder.build(corpus)
+	assert len(candidateRelations) == 8
+
+	def toIDs(candidates):
+		return [ tuple( e.sourceEntityID for e in cr.entities ) for cr in candidates ]
+
+	batches = list(candidateBuilder.iterBuild(corpus))
+	assert [ len(batch) for batch in batches ] == [6,2]
+	assert all( cr.sentence is batch[0].sentence for batch in batches for cr in batch )
+
+	batches = list(candidateBuilder.iterBuild(corpus,batchSize=3))
+	assert [ len(batch) for batch in batches ] == [3,3,2]
+	assert toIDs([ cr for batch in batches for cr in batch ]) == toIDs(candidateRelations)
+	assert [ cr.knownTypesAndArgNames for batch in batches for cr in batch ] == [ cr.knownTypesAndArgNames for cr in candidateRelations ]
+
+def test_candidatebuilder_acceptedEntityTypes_repeatedTypes():
+	text = '<gene id="1">EGFR</gene> binds <drug id="2">erlotinib</drug> and <gene id="3">KRAS</gene> but not <gene id="4">BRAF</gene> or <drug id="5">aspirin</drug>.'
+
+	corpus = kindred.Corpus(text,loadFromSimpleTag=True)
+
+	parser = kindred.Parser()
+	parser.parse(corpus)
+
+	acceptedEntityTypes = [('gene','gene','drug'),('drug','gene','gene'),('disease','gene','gene')]
+	candidateBuilder = kindred.CandidateBuilder(entityCount=3,acceptedEntityTypes=acceptedEntityTypes)
+	candidateRelations = candidateBuilder.build(corpus)
+
+	# Should match filtering all the permutations (in the same order)
+	entities = corpus.documents[0].entities
+	expected = [ tuple( e.sourceEntityID for e in p ) for p in itertools.permutations(entities,3) if tuple( e.entityType for e in p ) in acceptedEntityTypes ]
+	assert len(expected) == 24
+	assert [ tuple( e.sourceEntityID for e in cr.entities ) for cr in candidateRelations ] == expected
+
+def test_candidatebuilder_distanceLimits():
+	text = '<drug id="1">Erlotinib</drug> is a common treatment for <cancer id="2">NSCLC</cancer> which targets <gene id="3">EGFR</gene>. <relation type="treats" subj="1" obj="2" />'
+
+	corpus = kindred.Corpus(text,loadFromSimpleTag=True)
+
+	parser = kindred.Parser()
+	parser.parse(corpus)
+
+	sentence = corpus.documents[0].sentences[0]
+	(_,drugTokens),(_,cancerTokens),(_,geneTokens) = sentence.entityAnnotations
+	assert (drugTokens,cancerTokens,geneTokens) == ([0],[6],[9])
+	sentence.dependencies = [(4,0,'nsubj'),(4,6,'prep'),(6,9,'relcl')]
+
+	def toIDs(candidates):
+		return [ tuple( e.sourceEntityID for e in cr.entities ) for cr in candidates ]
+
+	candidateBuilder = kindred.CandidateBuilder(maxTokenDistance=5)
+	assert toIDs(candidateBuilder.build(corpus)) == [('2','3'),('3','2')]
+	report = candidateBuilder.getPruningReport()
+	assert report['candidates'] == 6 and report['relations'] == 1
+	assert report['maxTokenDistance'] == {'removed':4,'removedRelations':1,'recallLoss':1.0}
+	assert report['total'] == {'removed':4,'removedRelations':1,'recallLoss':1.0}
+
+	candidateBuilder = kindred.CandidateBuilder(maxDependencyDistance=2)
+	assert toIDs(candidateBuilder.build(corpus)) == [('1','2'),('2','1'),('2','3'),('3','2')]
+	report = candidateBuilder.getPruningReport()
+	assert report['maxDependencyDistance'] == {'removed':2,'removedRelations':0,'recallLoss':0.0}
+
+	candidateBuilder = kindred.CandidateBuilder(entityCount=3,maxTokenDistance=6,maxDependencyDistance=3)
+	assert len(candidateBuilder.build(corpus)) == 0
+	report = candidateBuilder.getPruningReport()
+	assert report['maxTokenDistance']['removed'] == 6
+	assert report['maxDependencyDistance']['removed'] == 0
+	assert report['total']['removed'] == 6
+
+def test_candidatebuilder_symmetric():
+	text = '<gene id="1">EGFR</gene> binds <drug id="2">erlotinib</drug> and <gene id="3">KRAS</gene>. <relation type="interacts" arg1="2" arg2="1" />'
+
+	corpus = kindred.Corpus(text,loadFromSimpleTag=True)
+
+	parser = kindred.Parser()
+	parser.parse(corpus)
+
+	def toIDs(candidates):
+		return [ tuple( e.sourceEntityID for e in cr.entities ) for cr in candidates ]
+
+	candidateBuilder = kindred.CandidateBuilder(symmetric=True)
+	candidateRelations = candidateBuilder.build(corpus)
+	assert toIDs(candidateRelations) == [('1','2'),('1','3'),('2','3')]
+
+	# The known relation has its entities in the reverse of document order, so its argument names are reversed too
+	assert [ cr.knownTypesAndArgNames for cr in candidateRelations ] == [[('interacts',['arg2','arg1'])],[],[]]
+	assert candidateBuilder.buildTable(corpus).labelKeys == [('interacts','arg2','arg1')]
+
+	candidateBuilder = kindred.CandidateBuilder(symmetric=True,acceptedEntityTypes=[('drug','gene')])
+	assert toIDs(candidateBuilder.build(corpus)) == [('1','2'),('2','3')]
+
+def test_candidatebuilder_buildTable():
+	text = '<drug id="1">Erlotinib</drug> is a common treatment for <cancer id="2">NSCLC</cancer> which targets <gene id="3">EGFR</gene>. <drug id="4">Aspirin</drug> is the main cause of <disease id="5">boneitis</disease>. <relation type="treats" subj="1" obj="2" /> <relation type="causes" subj="4" obj="5" />'
+
+	corpus = kindred.Corpus(text,loadFromSimpleTag=True)
+
+	parser = kindred.Parser()
+	parser.parse(corpus)
+
+	candidateBuilder = kindred.CandidateBuilder()
+	candidateRelations = candidateBuilder.build(corpus)
+	candidateTable = candidateBuilder.buildTable(corpus)
+
+	assert isinstance(candidateTable,kindred.CandidateTable)
+	assert len(candidateTable) == 8
+	assert candidateTable.entityCount == 2
+	assert candidateTable.sentenceIndices.tolist() == [0,0,0,0,0,0,1,1]
+	assert candidateTable.entityIndices.tolist() == [[0,1],[0,2],[1,0],[1,2],[2,0],[2,1],[0,1],[1,0]]
+	assert candidateTable.labelKeys == [('treats','obj','subj'),('causes','obj','subj')]
+	assert candidateTable.getLabelMatrix().tolist() == [[0,0],[0,0],[1,0],[0,0],[0,0],[0,0],[0,0],[0,1]]
+	assert list(candidateTable) == candidateRelations
+
+	unpickled = pickle.loads(pickle.dumps(candidateTable))
+	assert [ (cr.entities,cr.knownTypesAndArgNames) for cr in unpickled ] == [ (cr.entities,cr.knownTypesAndArgNames) for cr in candidateRelations ]
+
 if __name__ == '__main__':
 	test_candidatebuilder_acceptedEntityTypes()
 
@@ -13,6 +13,10 @@ def test_relation_hash():
 	assert hash(rel3) == hash(rel4)
 	assert hash(rel1) != hash(rel3)
 
+	# The cached hash is reset when an attribute is set
+	rel2.knownTypesAndArgNames = [("causes",["drug","disease"])]
+	assert hash(rel2) == hash(rel3)
+
 def test_relation_str():
 	e1 = kindred.Entity('mutation','BRAF V600E mutation',[])
 	e2 = kindred.Entity('event','vemurafenib resistance',[])
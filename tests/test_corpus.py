@@ -92,3 +92,29 @@ def test_corpus_splitIntoSentences():
 	assert len(sentence1.dependencies) == 5
 	assert str(sentence1.entityAnnotations) == "[(<Entity drug:'Gefitinib' sourceid=3 [(0, 9)]>, [0])]"
 
+
+def test_corpus_vocabulary():
+	corpus = kindred.Corpus('<drug id="1">Erlotinib</drug> is an <gene id="2">EGFR</gene> inhibitor.',loadFromSimpleTag=True)
+	corpus.addDocument(kindred.Document('<drug id="3">Gefitinib</drug> is an inhibitor too.',loadFromSimpleTag=True))
+
+	parser = kindred.Parser()
+	parser.parse(corpus)
+
+	sentences = [ sentence for doc in corpus.documents for sentence in doc.sentences ]
+	assert all( sentence.vocabulary is corpus.vocabulary for sentence in sentences )
+
+	# Repeated words are stored once
+	assert corpus.vocabulary.getStrings(sentences[0].wordIDs) == ['Erlotinib','is','an','EGFR','inhibitor','.']
+	assert sentences[0].wordIDs[1] == sentences[1].wordIDs[1]
+
+	trainCorpus,testCorpus = corpus.split(0.5)
+	assert trainCorpus.vocabulary is corpus.vocabulary
+	assert corpus.splitIntoSentences().vocabulary is corpus.vocabulary
+
+def test_corpus_emptyParsed():
+	corpus = kindred.Corpus()
+	assert corpus.parsed == False
+
+	kindred.Parser().parse(corpus)
+	assert corpus.parsed == False
+	assert kindred.CandidateBuilder().build(corpus) == []
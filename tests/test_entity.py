@@ -1,4 +1,6 @@
 import kindred
+import multiprocessing
+import pytest
 
 def test_entity_str():
 	e1 = kindred.Entity(entityType="drug",text="Erlotinib",position=[(0,9)],sourceEntityID=None)
@@ -44,3 +46,35 @@ def test_entity_equals():
 	assert e1 != rel1
 	assert e2 != rel1
 	assert e3 != rel1
+
+def test_entity_equality():
+	e1 = kindred.Entity(entityType="drug",text="Erlotinib",position=[(0,9)],sourceEntityID="T16")
+	e2 = kindred.Entity(entityType="drug",text="Erlotinib",position=[(0,9)],sourceEntityID="T16")
+
+	assert e1 == e1
+	assert e1 != e2
+	assert hash(e1) == hash(e1.entityID)
+	assert e1.valueEquals(e2)
+	assert e1.valueEquals(e1.clone())
+	assert not e1.valueEquals(kindred.Entity(entityType="drug",text="Erlotinib",position=[(0,9)],sourceEntityID="T17"))
+
+	lookup = { e1:1 }
+	assert lookup[e1] == 1
+	assert not e2 in lookup
+
+def _createEntityIDs(count):
+	return [ kindred.Entity('drug','Erlotinib',[(0,9)]).entityID for _ in range(count) ]
+
+@pytest.mark.parametrize("startMethod", [ m for m in ['fork','spawn'] if m in multiprocessing.get_all_start_methods() ])
+def test_entity_uniqueIDsAcrossProcesses(startMethod):
+	parentIDs = _createEntityIDs(10)
+
+	pool = multiprocessing.get_context(startMethod).Pool(3)
+	try:
+		workerIDs = pool.map(_createEntityIDs, [10]*6, chunksize=1)
+	finally:
+		pool.terminate()
+
+	allIDs = parentIDs + [ entityID for ids in workerIDs for entityID in ids ]
+	assert len(set(allIDs)) == len(allIDs)
+	assert _createEntityIDs(1)[0] not in allIDs
@@ -0,0 +1,122 @@
+import kindred
+import os
+import tempfile
+
+from kindred.ParseCache import ParseCache
+from kindred.datageneration import generateTestData
+
+def test_parseCache_getAndSet():
+	with tempfile.TemporaryDirectory() as tempDir:
+		cache = ParseCache(tempDir)
+
+		key = cache.getKey('Erlotinib treats cancer','model=test')
+		assert not key in cache
+		assert cache.get(key) is None
+
+		sentences = [[['Erlotinib','treats','cancer'],['erlotinib','treat','cancer'],['NOUN','VERB','NOUN'],[0,10,17],[9,16,23],[1,1,1],['nsubj','ROOT','dobj']]]
+		cache.set(key,sentences)
+
+		assert key in cache
+		assert cache.get(key) == sentences
+		assert cache.hits == 1
+		assert cache.misses == 1
+
+		# A reloaded cache should see the same entries
+		reloaded = ParseCache(tempDir)
+		assert reloaded.size == cache.size
+		assert reloaded.get(key) == sentences
+
+def test_parseCache_overwrite():
+	with tempfile.TemporaryDirectory() as tempDir:
+		cache = ParseCache(tempDir)
+
+		key = cache.getKey('Erlotinib treats cancer','model=test')
+		sentences = [[['Erlotinib','treats','cancer'],['erlotinib','treat','cancer'],['NOUN','VERB','NOUN'],[0,10,17],[9,16,23],[1,1,1],['nsubj','ROOT','dobj']]]
+		cache.set(key,sentences)
+		cache.set(key,sentences)
+
+		assert cache.size == ParseCache(tempDir).size
+
+def test_parseCache_failedSetLeavesNoTempFile():
+	with tempfile.TemporaryDirectory() as tempDir:
+		cache = ParseCache(tempDir)
+
+		key = cache.getKey('Erlotinib treats cancer','model=test')
+		try:
+			cache.set(key,[[object()]])
+			assert False, "Expected an unserializable entry to fail"
+		except TypeError:
+			pass
+
+		assert not key in cache
+		assert cache.size == 0
+		assert [ f for _,_,files in os.walk(tempDir) for f in files ] == []
+
+def test_parseCache_lazySize():
+	with tempfile.TemporaryDirectory() as tempDir:
+		cache = ParseCache(tempDir)
+		key = cache.getKey('Erlotinib treats cancer','model=test')
+		cache.set(key,[[['Erlotinib'],['erlotinib'],['NOUN'],[0],[9],[0],['ROOT']]])
+
+		# Opening the cache doesn't walk its directory until the size is needed
+		reloaded = ParseCache(tempDir)
+		assert reloaded._size is None
+		assert reloaded.get(key) is not None
+		assert reloaded._size is None
+
+		otherKey = cache.getKey('Gefitinib treats cancer','model=test')
+		reloaded.set(otherKey,[[['Gefitinib'],['gefitinib'],['NOUN'],[0],[9],[0],['ROOT']]])
+		assert reloaded.size == ParseCache(tempDir).size
+		assert reloaded.size == sum( os.path.getsize(os.path.join(root,f)) for root,_,files in os.walk(tempDir) for f in files )
+
+def test_parseCache_keyDependsOnConfiguration():
+	cache = ParseCache(tempfile.mkdtemp())
+	key1 = cache.getKey('Erlotinib treats cancer','model=A')
+	key2 = cache.getKey('Erlotinib treats cancer','model=B')
+	key3 = cache.getKey('Erlotinib treats lung cancer','model=A')
+	assert len(set([key1,key2,key3])) == 3
+	
+def test_parseCache_eviction():
+	with tempfile.TemporaryDirectory() as tempDir:
+		cache = ParseCache(tempDir,maxSize=2000)
+
+		keys = []
+		for i in range(50):
+			key = cache.getKey('document %d' % i,'model=test')
+			sentences = [[['word%d' % j for j in range(i)],[],[],[],[],[],[]]]
+			cache.set(key,sentences)
+			keys.append(key)
+
+		assert cache.size <= 2000
+		assert keys[-1] in cache
+		assert not keys[0] in cache
+
+		cache.clear()
+		assert cache.size == 0
+		assert not keys[-1] in cache
+
+def test_parseCache_parser():
+	corpus, _ = generateTestData(positiveCount=10,negativeCount=10)
+	with tempfile.TemporaryDirectory() as tempDir:
+		uncachedCorpus = corpus.clone()
+		kindred.Parser().parse(uncachedCorpus)
+
+		firstCorpus = corpus.clone()
+		parser = kindred.Parser(cacheDirectory=tempDir)
+		parser.parse(firstCorpus)
+		assert parser.cache.hits == 0
+
+		secondCorpus = corpus.clone()
+		parser = kindred.Parser(cacheDirectory=tempDir)
+		parser.parse(secondCorpus)
+		assert parser.cache.hits == len(corpus.documents)
+
+		for corpusToCheck in [firstCorpus,secondCorpus]:
+			assert corpusToCheck.parsed
+			for doc1,doc2 in zip(uncachedCorpus.documents,corpusToCheck.documents):
+				assert len(doc1.sentences) == len(doc2.sentences)
+				for s1,s2 in zip(doc1.sentences,doc2.sentences):
+					assert [ (t.word,t.lemma,t.partofspeech,t.startPos,t.endPos) for t in s1.tokens ] == [ (t.word,t.lemma,t.partofspeech,t.startPos,t.endPos) for t in s2.tokens ]
+					assert s1.dependencies == s2.dependencies
+					assert [ (e.sourceEntityID,tokenIndices) for e,tokenIndices in s1.entityAnnotations ] == [ (e.sourceEntityID,tokenIndices) for e,tokenIndices in s2.entityAnnotations ]
+
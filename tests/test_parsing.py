@@ -1,5 +1,8 @@
 # -*- coding: utf-8 -*- 
 import os
+import pytest
+import multiprocessing
+import tempfile
 
 import kindred
 from kindred.datageneration import generateData,generateTestData
@@ -185,6 +188,296 @@ def test_notunicode():
 	assert isinstance(doc.sentences,list)
 	assert len(doc.sentences) == 1
 
+def assertSameParse(corpus1,corpus2):
+	assert len(corpus1.documents) == len(corpus2.documents)
+	for doc1,doc2 in zip(corpus1.documents,corpus2.documents):
+		assert len(doc1.sentences) == len(doc2.sentences)
+		for s1,s2 in zip(doc1.sentences,doc2.sentences):
+			assert s1.text == s2.text
+			assert [ (t.word,t.lemma,t.partofspeech,t.startPos,t.endPos) for t in s1.tokens ] == [ (t.word,t.lemma,t.partofspeech,t.startPos,t.endPos) for t in s2.tokens ]
+			assert s1.dependencies == s2.dependencies
+			annotations1 = [ (e.sourceEntityID,tokenIndices) for e,tokenIndices in s1.entityAnnotations ]
+			annotations2 = [ (e.sourceEntityID,tokenIndices) for e,tokenIndices in s2.entityAnnotations ]
+			assert annotations1 == annotations2
+
+def test_batchedParse():
+	corpus, _ = generateTestData(positiveCount=20,negativeCount=20)
+	unbatchedCorpus = corpus.clone()
+	batchedCorpus = corpus.clone()
+
+	kindred.Parser(batchSize=1).parse(unbatchedCorpus)
+	kindred.Parser(batchSize=7).parse(batchedCorpus)
+
+	assert unbatchedCorpus.parsed and batchedCorpus.parsed
+	assertSameParse(unbatchedCorpus,batchedCorpus)
+
+def test_multiprocessParse():
+	corpus, _ = generateTestData(positiveCount=20,negativeCount=20)
+	singleProcessCorpus = corpus.clone()
+	multiProcessCorpus = corpus.clone()
+
+	kindred.Parser().parse(singleProcessCorpus)
+	kindred.Parser(batchSize=3,processCount=2).parse(multiProcessCorpus)
+
+	assert multiProcessCorpus.parsed
+	assertSameParse(singleProcessCorpus,multiProcessCorpus)
+
+def test_entityMappingMethods():
+	text = '<drug id="1">Erlotinib</drug> is a <drug id="2">common</drug> <cancer id="3">treatment for <cancer id="4">lung</cancer></cancer> and unknown <cancer id="3">cancers</cancer>. <drug id="5">Aspirin</drug> is the <drug id="6">main</drug> cause of <disease id="7">bone<disease id="8">itis</disease></disease>.'
+	corpus = kindred.Corpus(text,loadFromSimpleTag=True)
+
+	sweepCorpus = corpus.clone()
+	intervalTreeCorpus = corpus.clone()
+
+	kindred.Parser(entityMapping='sweep').parse(sweepCorpus)
+	kindred.Parser(entityMapping='intervaltree').parse(intervalTreeCorpus)
+
+	assertSameParse(sweepCorpus,intervalTreeCorpus)
+	assert sum( len(s.entityAnnotations) for s in sweepCorpus.documents[0].sentences ) == 8
+
+def test_iterParse():
+	corpus, _ = generateTestData(positiveCount=20,negativeCount=20)
+	parsedCorpus = corpus.clone()
+	kindred.Parser().parse(parsedCorpus)
+
+	streamedCorpus = corpus.clone()
+	documentGenerator = ( d for d in streamedCorpus.documents )
+
+	parser = kindred.Parser(batchSize=3)
+	streamedDocuments = []
+	for d in parser.iterParse(documentGenerator):
+		assert isinstance(d,kindred.Document)
+		assert len(d.sentences) > 0
+		streamedDocuments.append(d)
+
+	assert streamedDocuments == streamedCorpus.documents
+	streamedCorpus.parsed = True
+	assertSameParse(parsedCorpus,streamedCorpus)
+
+	# Each window of documents (three with this batch size) has its own vocabulary so it doesn't grow with the stream
+	vocabularies = [ d.sentences[0].vocabulary for d in streamedDocuments ]
+	assert vocabularies[0] is vocabularies[2]
+	assert vocabularies[2] is not vocabularies[3]
+	assert len(vocabularies[0]) < len(parsedCorpus.vocabulary)
+
+def test_parsingWithoutAnnotations():
+	text = '<drug id="1">Erlotinib</drug> is a common treatment for <cancer id="2">NSCLC</cancer>. <drug id="3">Aspirin</drug> is the main cause of <disease id="4">boneitis</disease>.'
+	corpus = kindred.Corpus(text,loadFromSimpleTag=True)
+
+	parser = kindred.Parser(annotations=[])
+	assert parser.annotations == []
+	parser.parse(corpus)
+
+	doc = corpus.documents[0]
+	assert len(doc.sentences) == 2
+
+	expectedWords = "Erlotinib is a common treatment for NSCLC .".split()
+	assert [ t.word for t in doc.sentences[0].tokens ] == expectedWords
+	for sentence in doc.sentences:
+		assert sentence.dependencies == []
+		assert len(sentence.entityAnnotations) == 2
+
+def test_parsingWithOnlyDependencies():
+	text = 'You need to turn in your homework by next week'
+	corpus = kindred.Corpus(text,loadFromSimpleTag=True)
+	fullCorpus = corpus.clone()
+
+	kindred.Parser(annotations=['dependencies']).parse(corpus)
+	kindred.Parser().parse(fullCorpus)
+
+	sentence = corpus.documents[0].sentences[0]
+	fullSentence = fullCorpus.documents[0].sentences[0]
+	assert [ t.word for t in sentence.tokens ] == [ t.word for t in fullSentence.tokens ]
+	assert sentence.dependencies == fullSentence.dependencies
+
+def test_chunkedParse():
+	paragraph = '<drug id="1">Erlotinib</drug> is a common treatment for <cancer id="2">lung</cancer> and unknown cancers. It is taken daily.'
+	text = "\n\n".join( paragraph.replace('id="1"','id="%d"' % (2*i+1)).replace('id="2"','id="%d"' % (2*i+2)) for i in range(20) )
+	corpus = kindred.Corpus(text,loadFromSimpleTag=True)
+
+	chunkedCorpus = corpus.clone()
+	kindred.Parser(maxChunkLength=200).parse(chunkedCorpus)
+	kindred.Parser().parse(corpus)
+
+	doc = corpus.documents[0]
+	chunkedDoc = chunkedCorpus.documents[0]
+
+	chunkedTokens = [ t for sentence in chunkedDoc.sentences for t in sentence.tokens ]
+	for t in chunkedTokens:
+		assert chunkedDoc.text[t.startPos:t.endPos] == t.word
+
+	tokenInfo = [ (t.word,t.startPos,t.endPos) for sentence in doc.sentences for t in sentence.tokens if t.word.strip() ]
+	chunkedTokenInfo = [ (t.word,t.startPos,t.endPos) for t in chunkedTokens if t.word.strip() ]
+	assert tokenInfo == chunkedTokenInfo
+
+	for sentence in chunkedDoc.sentences:
+		sentenceStart,sentenceEnd = sentence.tokens[0].startPos,sentence.tokens[-1].endPos
+		assert sentence.text == chunkedDoc.text[sentenceStart:sentenceEnd]
+
+	annotated = [ (e.sourceEntityID,[ sentence.tokens[i].word for i in tokenIndices ]) for sentence in chunkedDoc.sentences for e,tokenIndices in sentence.entityAnnotations ]
+	assert len(annotated) == 40
+	assert annotated[0] == ('1',['Erlotinib'])
+	assert annotated[-1] == ('40',['lung'])
+
+def test_deduplicatedParse():
+	paragraph = '<drug id="1">Erlotinib</drug> is a common treatment for <cancer id="2">lung</cancer> and unknown cancers. It is taken daily.'
+	text = "\n\n".join( paragraph.replace('id="1"','id="%d"' % (2*i+1)).replace('id="2"','id="%d"' % (2*i+2)) for i in range(20) )
+	corpus = kindred.Corpus(text,loadFromSimpleTag=True)
+
+	deduplicatedCorpus = corpus.clone()
+	parser = kindred.Parser(deduplicate=True)
+	parser.parse(deduplicatedCorpus)
+	kindred.Parser().parse(corpus)
+
+	assert parser.reusedParseCount == 19
+
+	doc = corpus.documents[0]
+	deduplicatedDoc = deduplicatedCorpus.documents[0]
+
+	tokenInfo = [ (t.word,t.lemma,t.partofspeech,t.startPos,t.endPos) for sentence in doc.sentences for t in sentence.tokens if t.word.strip() ]
+	deduplicatedTokenInfo = [ (t.word,t.lemma,t.partofspeech,t.startPos,t.endPos) for sentence in deduplicatedDoc.sentences for t in sentence.tokens ]
+	assert tokenInfo == deduplicatedTokenInfo
+
+	annotated = [ (e.sourceEntityID,[ sentence.tokens[i].word for i in tokenIndices ]) for sentence in deduplicatedDoc.sentences for e,tokenIndices in sentence.entityAnnotations ]
+	assert len(annotated) == 40
+	assert annotated[0] == ('1',['Erlotinib'])
+	assert annotated[-1] == ('40',['lung'])
+
+	# Lines seen in an earlier parse are also reused
+	parser.parse(kindred.Corpus(text,loadFromSimpleTag=True))
+	assert parser.reusedParseCount == 39
+
+def test_deduplicatedParse_stoppedEarly():
+	texts = [ '<drug id="1">Erlotinib</drug> treats <cancer id="2">cancer %d</cancer>.\nCopyright statement.' % i for i in range(10) ]
+	corpus = kindred.Corpus()
+	for text in texts:
+		corpus.addDocument(kindred.Document(text,loadFromSimpleTag=True))
+
+	parser = kindred.Parser(deduplicate=True,processCount=2,batchSize=1)
+	for d in parser.iterParse(corpus.clone().documents):
+		break
+
+	# Lines that were still being parsed when the stream stopped are parsed again
+	deduplicatedCorpus = corpus.clone()
+	parser.parse(deduplicatedCorpus)
+	kindred.Parser(deduplicate=True).parse(corpus)
+	assertSameParse(corpus,deduplicatedCorpus)
+
+def test_incrementalParse():
+	text = '<drug id="1">Erlotinib</drug> is a common treatment for <cancer id="2">NSCLC</cancer>.'
+	corpus = kindred.Corpus(text,loadFromSimpleTag=True)
+	assert corpus.parsed == False
+
+	parser = kindred.Parser()
+	parser.parse(corpus)
+	assert corpus.parsed == True
+	firstSentences = corpus.documents[0].sentences
+
+	newDoc = kindred.Document('<drug id="3">Aspirin</drug> is the main cause of <disease id="4">boneitis</disease>.',loadFromSimpleTag=True)
+	corpus.addDocument(newDoc)
+	assert newDoc.parsed == False
+	assert corpus.parsed == False
+
+	parser.parse(corpus)
+	assert corpus.parsed == True
+	assert corpus.documents[0].sentences is firstSentences
+	assert len(firstSentences) == 1
+	assert len(newDoc.sentences) == 1
+	assert [ t.word for t in newDoc.sentences[0].tokens ] == ['Aspirin', 'is', 'the', 'main', 'cause', 'of', 'boneitis', '.']
+
+def test_reparseWithMoreAnnotations():
+	text = '<drug id="1">Erlotinib</drug> is a common treatment for <cancer id="2">NSCLC</cancer>.'
+	corpus = kindred.Corpus(text,loadFromSimpleTag=True)
+
+	kindred.Parser(annotations=['lemmas']).parse(corpus)
+	doc = corpus.documents[0]
+	assert doc.parsedAnnotations == ['lemmas']
+	assert doc.hasParsedAnnotations(['lemmas'])
+	assert not doc.hasParsedAnnotations(['dependencies'])
+	assert doc.sentences[0].dependencies == []
+
+	# A parser with fewer annotations keeps the existing parse
+	reducedSentences = doc.sentences
+	kindred.Parser(annotations=[]).parse(corpus)
+	assert doc.sentences is reducedSentences
+
+	# A parser with more annotations replaces it
+	kindred.Parser().parse(corpus)
+	assert doc.parsedAnnotations == ['dependencies','lemmas','partsofspeech']
+	assert len(doc.sentences) == 1
+	assert len(doc.sentences[0].dependencies) == len(doc.sentences[0].tokens)
+	assert [ e.sourceEntityID for e,_ in doc.sentences[0].entityAnnotations ] == ['1','2']
+
+def _createEntity(entityType,text,position,sourceEntityID):
+	return kindred.Entity(entityType,text,position,sourceEntityID)
+
+def test_entityAnnotationOrder():
+	# Entity annotations are in the order of the document's entities
+	text = '<disease id="T1"><gene id="T2">BRCA1</gene> breast cancer</disease> is treated with <drug id="T3">olaparib</drug>.'
+	corpus = kindred.Corpus(text,loadFromSimpleTag=True)
+	kindred.Parser().parse(corpus)
+
+	doc = corpus.documents[0]
+	assert [ e.sourceEntityID for e in doc.entities ] == ['T1','T2','T3']
+	assert [ (e.sourceEntityID,tokenIndices) for e,tokenIndices in doc.sentences[0].entityAnnotations ] == [('T1',[0,1,2]),('T2',[0]),('T3',[6])]
+
+@pytest.mark.parametrize("startMethod", [ m for m in ['fork','spawn'] if m in multiprocessing.get_all_start_methods() ])
+def test_entityAnnotationOrder_acrossProcesses(startMethod):
+	# Entities created in other processes have IDs from a different (random) namespace, which must not change the order
+	text = 'BRCA1 breast cancer is treated with olaparib.'
+	pool = multiprocessing.get_context(startMethod).Pool(1)
+	try:
+		workerEntity = pool.apply(_createEntity, ('gene','BRCA1',[(0,5)],'T2'))
+	finally:
+		pool.terminate()
+	parentEntities = [ kindred.Entity('disease','BRCA1 breast cancer',[(0,19)],'T1'), kindred.Entity('drug','olaparib',[(36,44)],'T3') ]
+
+	for entities in [ [parentEntities[0],workerEntity,parentEntities[1]], [parentEntities[1],workerEntity,parentEntities[0]] ]:
+		corpus = kindred.Corpus()
+		corpus.addDocument(kindred.Document(text,entities=entities))
+		kindred.Parser().parse(corpus)
+
+		doc = corpus.documents[0]
+		assert [ e.sourceEntityID for e,_ in doc.sentences[0].entityAnnotations ] == [ e.sourceEntityID for e in entities ]
+
+def test_rulesBackend():
+	text = '<drug id="1">Erlotinib</drug> is a common treatment for <cancer id="2">NSCLC</cancer>. <drug id="3">Aspirin</drug> is the main cause of <disease id="4">boneitis</disease>.'
+	corpus = kindred.Corpus(text,loadFromSimpleTag=True)
+
+	parser = kindred.Parser(backend='rules')
+	assert parser.annotations == []
+	parser.parse(corpus)
+
+	doc = corpus.documents[0]
+	assert len(doc.sentences) == 2
+	assert [ t.word for t in doc.sentences[0].tokens ] == ['Erlotinib', 'is', 'a', 'common', 'treatment', 'for', 'NSCLC', '.']
+	for sentence in doc.sentences:
+		assert sentence.dependencies == []
+		for t in sentence.tokens:
+			assert doc.text[t.startPos:t.endPos] == t.word
+
+	annotated = [ (e.sourceEntityID,[ sentence.tokens[i].word for i in tokenIndices ]) for sentence in doc.sentences for e,tokenIndices in sentence.entityAnnotations ]
+	assert annotated == [('1',['Erlotinib']),('2',['NSCLC']),('3',['Aspirin']),('4',['boneitis'])]
+
+	multiProcessCorpus = kindred.Corpus(text,loadFromSimpleTag=True)
+	kindred.Parser(backend='rules',processCount=2).parse(multiProcessCorpus)
+	assertSameParse(corpus,multiProcessCorpus)
+
+	with pytest.raises(AssertionError):
+		kindred.Parser(backend='rules',annotations=['dependencies'])
+
+def test_rulesBackend_modelLanguage():
+	import spacy
+
+	# The language comes from the meta data of a model saved to a directory, not from its name
+	with tempfile.TemporaryDirectory() as tempDir:
+		modelPath = os.path.join(tempDir,'my_model')
+		spacy.blank('de').to_disk(modelPath)
+		assert kindred.Parser(model=modelPath,backend='rules').nlp.lang == 'de'
+
+	assert kindred.Parser(model='fr',backend='rules').nlp.lang == 'fr'
+	assert kindred.Parser(backend='rules').nlp.lang == 'en'
+
 if __name__ == '__main__':
 	#test_largeSentence()
 	test_parsing_dependencyGraph()
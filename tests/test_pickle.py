@@ -24,3 +24,121 @@ def test_pickle():
 	
 	f1score = kindred.evaluate(testCorpusGold, predictionCorpus, metric='f1score')
 	assert f1score == 1.0
+
+def test_pickleParsedCorpus():
+	corpus = kindred.Corpus('<drug id="1">Erlotinib</drug> is a common treatment for <cancer id="2">NSCLC</cancer><relation type="treats" subj="1" obj="2" />',loadFromSimpleTag=True)
+	kindred.Parser().parse(corpus)
+	candidateRelations = kindred.CandidateBuilder().build(corpus)
+
+	unpickledCorpus,unpickledCandidateRelations = pickle.loads(pickle.dumps((corpus,candidateRelations)))
+
+	doc,unpickledDoc = corpus.documents[0],unpickledCorpus.documents[0]
+	assert unpickledDoc.entities == doc.entities
+	assert unpickledDoc.relations == doc.relations
+	assert [ (t.word,t.lemma,t.partofspeech,t.startPos,t.endPos) for t in unpickledDoc.sentences[0].tokens ] == [ (t.word,t.lemma,t.partofspeech,t.startPos,t.endPos) for t in doc.sentences[0].tokens ]
+	assert [ c.entities for c in unpickledCandidateRelations ] == [ c.entities for c in candidateRelations ]
+	assert [ c.knownTypesAndArgNames for c in unpickledCandidateRelations ] == [ c.knownTypesAndArgNames for c in candidateRelations ]
+
+def test_pickleDocumentWithoutParseState():
+	corpus = kindred.Corpus('<drug id="1">Erlotinib</drug> is a common treatment for <cancer id="2">NSCLC</cancer>',loadFromSimpleTag=True)
+	corpus.addDocument(kindred.Document('Not parsed yet.'))
+	kindred.Parser().parse(corpus)
+	corpus.documents[1].sentences = []
+
+	# Documents pickled by older versions don't have the parse state attributes
+	for doc in corpus.documents:
+		del doc.parsed
+		del doc.parsedAnnotations
+
+	unpickledCorpus = pickle.loads(pickle.dumps(corpus))
+	assert unpickledCorpus.documents[0].parsed == True
+	assert unpickledCorpus.documents[0].parsedAnnotations is None
+	assert unpickledCorpus.documents[1].parsed == False
+	assert unpickledCorpus.parsed == False
+
+def test_pickleClassifierWithoutPredictionCandidateBuilder():
+	trainCorpus, testCorpusGold = generateTestData(positiveCount=100,negativeCount=100)
+
+	predictionCorpus = testCorpusGold.clone()
+	predictionCorpus.removeRelations()
+
+	classifier = kindred.RelationClassifier()
+	classifier.train(trainCorpus)
+
+	# Classifiers pickled by older versions used the training candidate builder for predictions
+	del classifier.predictionCandidateBuilder
+	del classifier.parseCacheDirectory
+
+	classifier = pickle.loads(pickle.dumps(classifier))
+	assert classifier.predictionCandidateBuilder is classifier.candidateBuilder
+	assert classifier.parseCacheDirectory is None
+
+	classifier.predict(predictionCorpus)
+	
+	f1score = kindred.evaluate(testCorpusGold, predictionCorpus, metric='f1score')
+	assert f1score == 1.0
+
+class _OldPickle:
+	# Pickles as an object of the given class with a dictionary of attributes (as older versions of the class did)
+	def __init__(self,cls,state):
+		self.cls = cls
+		self.state = state
+
+	def __reduce__(self):
+		return (object.__new__, (self.cls,), self.state)
+
+def test_pickleOldFormats():
+	text = 'Erlotinib treats NSCLC'
+	e1 = _OldPickle(kindred.Entity, {'entityType':'drug','sourceEntityID':'T1','externalID':None,'text':'Erlotinib','position':[(0,9)],'metadata':{},'entityID':1})
+	e2 = _OldPickle(kindred.Entity, {'entityType':'cancer','sourceEntityID':'T2','externalID':None,'text':'NSCLC','position':[(17,22)],'metadata':{},'entityID':2})
+	tokens = [ _OldPickle(kindred.Token, {'word':w,'lemma':w.lower(),'partofspeech':'NN','startPos':s,'endPos':e}) for w,s,e in [('Erlotinib',0,9),('treats',10,16),('NSCLC',17,22)] ]
+	sentence = _OldPickle(kindred.Sentence, {'text':text,'tokens':tokens,'dependencies':[(1,0,'nsubj'),(1,2,'dobj'),(-1,1,'ROOT')],'sourceFilename':None,'entityAnnotations':[(e1,[0]),(e2,[2])]})
+	relation = _OldPickle(kindred.Relation, {'relationType':'treats','entities':[e1,e2],'argNames':['subj','obj'],'probability':None,'sourceRelationID':None})
+	doc = _OldPickle(kindred.Document, {'text':text,'entities':[e1,e2],'relations':[relation],'sentences':[sentence],'sourceFilename':None,'metadata':{}})
+	corpus = _OldPickle(kindred.Corpus, {'documents':[doc],'parsed':True})
+	candidateRelation = _OldPickle(kindred.CandidateRelation, {'entities':[e1,e2],'knownTypesAndArgNames':[('treats',('subj','obj'))],'sentence':sentence})
+
+	corpus,candidateRelation = pickle.loads(pickle.dumps((corpus,candidateRelation)))
+
+	doc = corpus.documents[0]
+	assert corpus.parsed == True
+	assert isinstance(corpus.vocabulary,kindred.Vocabulary)
+	assert [ (e.sourceEntityID,e.entityID) for e in doc.entities ] == [('T1',1),('T2',2)]
+	assert doc.relations[0].entities == doc.entities
+	assert candidateRelation.entities == doc.entities
+	assert candidateRelation.sentence is doc.sentences[0]
+
+	sentence = doc.sentences[0]
+	assert [ (t.word,t.lemma,t.startPos,t.endPos) for t in sentence.tokens ] == [('Erlotinib','erlotinib',0,9),('treats','treats',10,16),('NSCLC','nsclc',17,22)]
+	assert sentence.vocabulary.getStrings(sentence.wordIDs) == ['Erlotinib','treats','NSCLC']
+	assert sentence.dependencySources.tolist() == [1,1,-1]
+	assert sentence.vocabulary.getStrings(sentence.dependencyTypeIDs) == ['nsubj','dobj','ROOT']
+	assert sentence.entityAnnotations == [(doc.entities[0],[0]),(doc.entities[1],[2])]
+
+	# And they can be pickled again in the current format
+	unpickledSentence = pickle.loads(pickle.dumps(sentence))
+	assert unpickledSentence.dependencies == sentence.dependencies
+
+def test_pickleOnlyUsedStrings():
+	corpus, _ = generateTestData(positiveCount=100,negativeCount=100)
+	kindred.Parser().parse(corpus)
+
+	# A pickled document only carries the strings of its own sentences, not the whole vocabulary of the corpus
+	doc = corpus.documents[0]
+	unpickledDoc = pickle.loads(pickle.dumps(doc))
+	for sentence,unpickledSentence in zip(doc.sentences,unpickledDoc.sentences):
+		usedStrings = set( s for ids in [sentence.wordIDs,sentence.lemmaIDs,sentence.partofspeechIDs,sentence.dependencyTypeIDs] for s in sentence.vocabulary.getStrings(ids) )
+		assert sorted(unpickledSentence.vocabulary.strings) == sorted(usedStrings)
+		assert len(unpickledSentence.vocabulary) < len(corpus.vocabulary)
+		assert [ (t.word,t.lemma,t.partofspeech,t.startPos,t.endPos) for t in unpickledSentence.tokens ] == [ (t.word,t.lemma,t.partofspeech,t.startPos,t.endPos) for t in sentence.tokens ]
+		assert unpickledSentence.dependencies == sentence.dependencies
+
+	# The sentences of an unpickled corpus share its vocabulary again
+	unpickledCorpus = pickle.loads(pickle.dumps(corpus))
+	unpickledSentences = [ sentence for doc in unpickledCorpus.documents for sentence in doc.sentences ]
+	assert all( sentence.vocabulary is unpickledCorpus.vocabulary for sentence in unpickledSentences )
+	assert len(unpickledCorpus.vocabulary) <= len(corpus.vocabulary)
+	sentences = [ sentence for doc in corpus.documents for sentence in doc.sentences ]
+	for sentence,unpickledSentence in zip(sentences,unpickledSentences):
+		assert unpickledCorpus.vocabulary.getStrings(unpickledSentence.wordIDs) == corpus.vocabulary.getStrings(sentence.wordIDs)
+		assert unpickledSentence.dependencies == sentence.dependencies
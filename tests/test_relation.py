@@ -1,4 +1,5 @@
 import kindred
+import pickle
 
 def test_relation_hash():
 	e1 = kindred.Entity('mutation','BRAF V600E mutation',[])
@@ -85,3 +86,34 @@ def test_relation_triple_equals():
 	assert rel3 != e1
 	assert rel4 != e1
 
+
+def test_relation_cachedHash():
+	e1 = kindred.Entity('drug','erlotinib',[(0,9)])
+	e2 = kindred.Entity('cancer','NSCLC',[(30,35)])
+
+	rel1 = kindred.Relation(relationType="treats",entities=[e1,e2],argNames=['drug','cancer'])
+	rel2 = kindred.Relation(relationType="treats",entities=[e1,e2],argNames=['drug','cancer'])
+	assert rel1 == rel2
+	assert hash(rel1) == hash(rel2)
+	assert rel2 in set([rel1])
+
+	rel2.relationType = 'causes'
+	assert rel1 != rel2
+	assert not rel2 in set([rel1])
+
+	rel2.relationType = 'treats'
+	assert rel2 in set([rel1])
+	rel2.entities = [e2,e1]
+	assert not rel2 in set([rel1])
+	rel2.entities = [e1,e2]
+	rel2.argNames = ['a','b']
+	assert not rel2 in set([rel1])
+
+	unpickled = pickle.loads(pickle.dumps(rel1))
+	assert unpickled.valueEquals(rel1)
+	assert unpickled == rel1
+
+	clonedEntities = [ e1.clone(), e2.clone() ]
+	rel3 = kindred.Relation(relationType="treats",entities=clonedEntities,argNames=['drug','cancer'])
+	assert rel1 != rel3
+	assert rel1.valueEquals(rel3)
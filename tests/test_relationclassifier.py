@@ -239,6 +239,67 @@ def test_predicting_duplicates():
 	relations = [ r for doc in testCorpus.documents for r in doc.relations ]
 	assert len(relations) == len(set(relations)), "Duplicate relations found in predictions"
 			
+def test_predicting_batches():
+	trainCorpus, testCorpus = generateTestData(positiveCount=100,negativeCount=100,relTypes=2)
+
+	testCorpus.removeRelations()
+	batchedCorpus = testCorpus.clone()
+
+	classifier = kindred.RelationClassifier()
+	classifier.train(trainCorpus)
+
+	classifier.predict(testCorpus)
+	classifier.predict(batchedCorpus,batchSize=7)
+
+	def toTuples(corpus):
+		return [ (r.relationType,tuple( e.sourceEntityID for e in r.entities ),tuple(r.argNames)) for doc in corpus.documents for r in doc.relations ]
+
+	assert len(toTuples(testCorpus)) > 0
+	assert toTuples(batchedCorpus) == toTuples(testCorpus)
+			
+def test_symmetric():
+	trainCorpus, testCorpusGold = generateTestData(positiveCount=100,negativeCount=100)
+
+	predictionCorpus = testCorpusGold.clone()
+	predictionCorpus.removeRelations()
+
+	classifier = kindred.RelationClassifier(symmetric=True)
+	classifier.train(trainCorpus)
+	classifier.predict(predictionCorpus)
+
+	# Predicted relations have their entities in document order
+	for doc in predictionCorpus.documents:
+		for r in doc.relations:
+			positions = [ doc.entities.index(e) for e in r.entities ]
+			assert positions == sorted(positions)
+
+	# The gold relations are compared with their entities (and argument names) in document order too
+	for doc in testCorpusGold.documents:
+		for r in doc.relations:
+			order = sorted(range(len(r.entities)), key=lambda i : doc.entities.index(r.entities[i]))
+			r.entities = [ r.entities[i] for i in order ]
+			r.argNames = [ r.argNames[i] for i in order ]
+
+	f1score = kindred.evaluate(testCorpusGold, predictionCorpus, metric='f1score')
+	assert f1score == 1.0
+			
+def test_trainWithCandidateTable():
+	trainCorpus, testCorpusGold = generateTestData(positiveCount=100,negativeCount=100)
+
+	predictionCorpus = testCorpusGold.clone()
+	predictionCorpus.removeRelations()
+
+	parser = kindred.Parser()
+	parser.parse(trainCorpus)
+	candidateTable = kindred.CandidateBuilder().buildTable(trainCorpus)
+
+	classifier = kindred.RelationClassifier()
+	classifier.train(candidateTable)
+	classifier.predict(predictionCorpus)
+
+	f1score = kindred.evaluate(testCorpusGold, predictionCorpus, metric='f1score')
+	assert f1score == 1.0
+			
 def test_singleClassifier_twoRelTypes():
 	trainCorpus, devCorpus = generateTestData(positiveCount=100,negativeCount=100,relTypes=2)
 
@@ -274,6 +335,39 @@ def test_doublelabels():
 	f1score = kindred.evaluate(devCorpus, predictionCorpus, metric='f1score')
 	assert round(f1score,3) == 1.0
 
+def test_featuresWithoutDependencies():
+	trainCorpus, devCorpus = generateTestData(positiveCount=100,negativeCount=100,relTypes=1)
+
+	predictionCorpus = devCorpus.clone()
+	predictionCorpus.removeRelations()
+
+	classifier = kindred.RelationClassifier(features=['entityTypes','unigramsBetweenEntities'])
+	classifier.train(trainCorpus)
+	classifier.predict(predictionCorpus)
+
+	# The classifier parsed the corpora itself and didn't need a dependency parse for these features
+	for doc in trainCorpus.documents + predictionCorpus.documents:
+		for sentence in doc.sentences:
+			assert sentence.dependencies == []
+
+	f1score = kindred.evaluate(devCorpus, predictionCorpus, metric='f1score')
+	assert round(f1score,3) == 1.0
+
+def test_dependencyFeaturesAfterReducedParse():
+	trainCorpus, _ = generateTestData(positiveCount=100,negativeCount=100,relTypes=1)
+
+	kindred.RelationClassifier(features=['entityTypes','unigramsBetweenEntities']).train(trainCorpus)
+
+	# The default features need dependencies, so the corpus is parsed again instead of reusing the reduced parse
+	classifier = kindred.RelationClassifier()
+	classifier.train(trainCorpus)
+	for doc in trainCorpus.documents:
+		for sentence in doc.sentences:
+			assert len(sentence.dependencies) == len(sentence.tokens)
+
+	dependencyFeatures = [ name for name in classifier.vectorizer.getFeatureNames() if name.startswith('dependencypath') ]
+	assert len(dependencyFeatures) > 0
+
 if __name__ == '__main__':
 	test_singleFeature_entityTypes()
 
@@ -1,6 +1,8 @@
 import os
 import tempfile
 import shutil
+import gzip
+import json
 
 import kindred
 import pytest
@@ -122,6 +124,26 @@ def test_saveBiocFile_fromSimpleTag():
 	assertEntity(entities[1],expectedType='gene',expectedText='APC',expectedPos=[(49,52)],expectedSourceEntityID="T2")
 	assert relations == [kindred.Relation('causes',[sourceEntityIDToEntity["T1"],sourceEntityIDToEntity["T2"]],['obj','subj'])], "(%s) not as expected" % relations
 
+def test_saveBiocFile_withoutSourceEntityIDs():
+	text = 'The colorectal cancer was caused by mutations in APC and KRAS'
+
+	# Entities without a source ID are numbered within each document so the same corpus is always saved the same way
+	savedXML = []
+	with TempDir() as tempDir:
+		for i in range(2):
+			entities = [ kindred.Entity('disease','colorectal cancer',[(4,21)]), kindred.Entity('gene','APC',[(49,52)],sourceEntityID='1'), kindred.Entity('gene','KRAS',[(57,61)]) ]
+			corpus = kindred.Corpus()
+			corpus.addDocument(kindred.Document(text,entities=entities))
+			tempFile = os.path.join(tempDir,'corpus%d.bioc.xml' % i)
+			kindred.save(corpus,'biocxml',tempFile)
+			with open(tempFile) as f:
+				savedXML.append(f.read())
+
+		loadedCorpus = kindred.load('biocxml',tempFile)
+
+	assert savedXML[0] == savedXML[1]
+	assert [ (e.text,e.sourceEntityID) for e in loadedCorpus.documents[0].entities ] == [('colorectal cancer','2'),('APC','1'),('KRAS','3')]
+
 def test_saveStandoffFile_fromSimpleTag_triple():
 	text = '<drug id="T1">Erlotinib</drug>, a <gene id="T2">EGFR</gene> inhibitor is commonly used for <disease id="T3">NSCLC</disease> patients. <relation type="druginfo" drug="T1" gene="T2" disease="T3" />'
 	corpus = kindred.Corpus(text,loadFromSimpleTag=True)
@@ -251,6 +273,83 @@ def test_saveStandoffFile_SeparateSentences():
 	assertEntity(entities[1],expectedType='gene',expectedText='P53',expectedPos=[(39,42)],expectedSourceEntityID="T2")
 	assert relations == [kindred.Relation('causes',[sourceEntityIDToEntity["T1"],sourceEntityIDToEntity["T2"]],['obj','subj'],sourceRelationID='R1')], "(%s) not as expected" % relations
 	
+def assertSameParse(corpus1,corpus2):
+	for doc1,doc2 in zip(corpus1.documents,corpus2.documents):
+		assert len(doc1.sentences) == len(doc2.sentences)
+		for sentence1,sentence2 in zip(doc1.sentences,doc2.sentences):
+			assert sentence1.text == sentence2.text
+			assert [ (t.word,t.lemma,t.partofspeech,t.startPos,t.endPos) for t in sentence1.tokens ] == [ (t.word,t.lemma,t.partofspeech,t.startPos,t.endPos) for t in sentence2.tokens ]
+			assert sentence1.dependencies == sentence2.dependencies
+			assert [ (e.sourceEntityID,tokenIndices) for e,tokenIndices in sentence1.entityAnnotations ] == [ (e.sourceEntityID,tokenIndices) for e,tokenIndices in sentence2.entityAnnotations ]
+
+@pytest.mark.parametrize("dataFormat", ['standoff','biocxml'])
+def test_saveWithParse(dataFormat):
+	texts = ['The <disease id="T1">colorectal cancer</disease> was caused by mutations in <gene id="T2">APC</gene><relation type="causes" subj="T2" obj="T1" />','<disease id="T1">Li-Fraumeni</disease> was caused by mutations in <gene id="T2">P53</gene>. It is rare.<relation type="causes" subj="T2" obj="T1" />']
+	corpus = kindred.Corpus()
+	for t in texts:
+		corpus.addDocument(kindred.Document(t,loadFromSimpleTag=True))
+
+	parser = kindred.Parser()
+	parser.parse(corpus)
+
+	with TempDir() as tempDir:
+		path = tempDir if dataFormat == 'standoff' else os.path.join(tempDir,'corpus')
+
+		kindred.save(corpus,dataFormat,path,includeParse=True)
+		loadedCorpus = kindred.load(dataFormat,path)
+
+	assert loadedCorpus.parsed == True
+	assert len(loadedCorpus.documents) == 2
+	assertSameParse(corpus,loadedCorpus)
+
+def test_saveWithParse_editedText():
+	corpus = kindred.Corpus('<disease id="T1">Li-Fraumeni</disease> was caused by mutations in <gene id="T2">P53</gene>',loadFromSimpleTag=True)
+	kindred.Parser().parse(corpus)
+
+	with TempDir() as tempDir:
+		kindred.save(corpus,'standoff',tempDir,includeParse=True)
+		txtPath = [ os.path.join(tempDir,filename) for filename in os.listdir(tempDir) if filename.endswith('.txt') ][0]
+		with open(txtPath,'a') as f:
+			f.write(' and more')
+
+		loadedCorpus = kindred.load('standoff',tempDir)
+
+	assert loadedCorpus.parsed == False
+	assert loadedCorpus.documents[0].sentences == []
+
+def test_saveWithParse_annotations():
+	corpus = kindred.Corpus('<disease id="T1">Li-Fraumeni</disease> was caused by mutations in <gene id="T2">P53</gene>',loadFromSimpleTag=True)
+	kindred.Parser(annotations=['lemmas']).parse(corpus)
+
+	with TempDir() as tempDir:
+		kindred.save(corpus,'standoff',tempDir,includeParse=True)
+		loadedCorpus = kindred.load('standoff',tempDir)
+
+	assert loadedCorpus.parsed == True
+	assert loadedCorpus.documents[0].parsedAnnotations == ['lemmas']
+	assertSameParse(corpus,loadedCorpus)
+
+def test_saveWithParse_sidecarVersion():
+	corpus = kindred.Corpus('<disease id="T1">Li-Fraumeni</disease> was caused by mutations in <gene id="T2">P53</gene>',loadFromSimpleTag=True)
+	kindred.Parser().parse(corpus)
+
+	with TempDir() as tempDir:
+		kindred.save(corpus,'standoff',tempDir,includeParse=True)
+		sidecarPath = os.path.join(tempDir,'kindred.parse.json.gz')
+		with gzip.open(sidecarPath,'rt',encoding='utf8') as f:
+			sidecar = json.load(f)
+
+		assert sidecar['version'] == 1
+
+		# Unknown versions are ignored
+		sidecar['version'] = 1000
+		with gzip.open(sidecarPath,'wt',encoding='utf8') as f:
+			json.dump(sidecar,f)
+		unknownLoadedCorpus = kindred.load('standoff',tempDir)
+
+	assert unknownLoadedCorpus.parsed == False
+	assert unknownLoadedCorpus.documents[0].sentences == []
+
 if __name__ == '__main__':
 	#test_saveStandoffFile_PredictedRelations()
 	test_saveBB3Data()
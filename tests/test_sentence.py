@@ -1,4 +1,5 @@
 import kindred
+import pickle
 
 def test_sentence_noDependencyInfo(capfd):
 	text = 'mutations cause dangerous cancer'
@@ -76,3 +77,103 @@ def test_sentence_addEntityWithLocations(capfd):
 
 	assert s.entityAnnotations == [ (e1,[2]), (e2,[5]) ]
 
+
+def test_sentence_columns():
+	text = 'lots of mutations cause dangerous cancer'
+	tokens = [ kindred.Token(w,w.upper(),'NN',i*10,i*10+len(w)) for i,w in enumerate(text.split()) ]
+
+	s = kindred.Sentence(text,tokens,dependencies=[(2,3,'a'),(3,5,'b'),(4,5,'c')])
+
+	assert s.vocabulary.getStrings(s.wordIDs) == text.split()
+	assert s.vocabulary.getStrings(s.partofspeechIDs) == ['NN'] * 6
+	assert s.startPositions.tolist() == [0,10,20,30,40,50]
+	assert s.dependencySources.tolist() == [2,3,4]
+	assert s.vocabulary.getStrings(s.dependencyTypeIDs) == ['a','b','c']
+
+	columnSentence = kindred.Sentence.fromColumns(text,s.vocabulary,s.wordIDs,s.lemmaIDs,s.partofspeechIDs,s.startPositions,s.endPositions,s.dependencySources,s.dependencyTargets,s.dependencyTypeIDs)
+	assert isinstance(columnSentence.tokens,list)
+	assert [ (t.word,t.lemma,t.partofspeech,t.startPos,t.endPos) for t in columnSentence.tokens ] == [ (t.word,t.lemma,t.partofspeech,t.startPos,t.endPos) for t in tokens ]
+	assert columnSentence.dependencies == [(2,3,'a'),(3,5,'b'),(4,5,'c')]
+	assert str(columnSentence) == text
+
+def test_sentence_pickle():
+	text = 'lots of mutations cause dangerous cancer'
+	tokens = [ kindred.Token(w,w.upper(),'NN',i*10,i*10+len(w)) for i,w in enumerate(text.split()) ]
+
+	s = kindred.Sentence(text,tokens,dependencies=[(2,3,'a'),(3,5,'b'),(4,5,'c')])
+
+	unpickled = pickle.loads(pickle.dumps(s))
+	assert [ (t.word,t.lemma,t.partofspeech,t.startPos,t.endPos) for t in unpickled.tokens ] == [ (t.word,t.lemma,t.partofspeech,t.startPos,t.endPos) for t in tokens ]
+	assert unpickled.dependencies == [(2,3,'a'),(3,5,'b'),(4,5,'c')]
+
+	nodes,edges = unpickled.extractMinSubgraphContainingNodes([2,5])
+	assert nodes == set([2,3,5])
+	assert edges == set([(2,3,'a'),(3,5,'b')])
+
+def test_sentence_cachedDependencyGraph():
+	text = 'lots of mutations cause dangerous cancer'
+	tokens = [ kindred.Token(w,None,None,0,0) for w in text.split() ]
+
+	s = kindred.Sentence(text,tokens,dependencies=[(2,3,'a'),(3,5,'b'),(4,5,'c')])
+
+	graph = s.getDependencyGraph()
+	assert s.getDependencyGraph() is graph
+	assert sorted( (min(a,b),max(a,b)) for a,b in graph.edges() ) == [(2,3),(3,5),(4,5)]
+
+	nodes,edges = s.extractMinSubgraphContainingNodes([2,5])
+	assert s.getDependencyGraph() is graph
+
+	s.dependencies = [(2,4,'d'),(4,5,'c')]
+	assert s.getDependencyGraph() is not graph
+
+	nodes,edges = s.extractMinSubgraphContainingNodes([2,5])
+	assert nodes == set([2,4,5])
+	assert edges == set([(2,4,'d'),(4,5,'c')])
+
+def test_sentence_treeDependencyPath(capfd):
+	text = 'lots of mutations in the gene cause very dangerous cancer'
+	tokens = [ kindred.Token(w,None,None,0,0) for w in text.split() ]
+	dependencies = [(2,0,'nsubj'),(0,1,'prep'),(1,5,'pobj'),(5,4,'det'),(2,3,'prep'),(3,5,'pobj2'),(6,2,'nsubj'),(6,6,'ROOT'),(6,9,'dobj'),(9,8,'amod'),(8,7,'advmod')]
+	# Tree version of the dependencies (without the cycle through 'in')
+	treeDependencies = [ d for d in dependencies if d[2] != 'pobj2' ]
+
+	for deps in [treeDependencies,dependencies]:
+		s = kindred.Sentence(text,tokens,dependencies=deps)
+		assert (s._getDependencyTree() is not None) == (deps is treeDependencies)
+		for minSet in [[0,9],[5,7],[4,7,9],[6],[5,5,6],list(range(10))]:
+			assert s.extractMinSubgraphContainingNodes(minSet,method='tree') == s.extractMinSubgraphContainingNodes(minSet,method='networkx')
+
+	s = kindred.Sentence(text,tokens,dependencies=treeDependencies)
+	nodes,edges = s.extractMinSubgraphContainingNodes([4,7,9],method='tree')
+	assert nodes == set([0,1,2,4,5,6,7,8,9])
+	assert edges == set([(0,2,'nsubj'),(0,1,'prep'),(1,5,'pobj'),(4,5,'det'),(2,6,'nsubj'),(6,9,'dobj'),(8,9,'amod'),(7,8,'advmod')])
+
+	s.dependencies = [(0,1,'a'),(2,3,'b'),(3,4,'c')]
+	nodes,edges = s.extractMinSubgraphContainingNodes([0,2,4,9],method='tree')
+	out, err = capfd.readouterr()
+	assert err.splitlines() == ['WARNING. 1 node(s) not found in dependency graph!','WARNING. No path found between nodes 0 and 2!','WARNING. No path found between nodes 0 and 4!']
+	assert nodes == set([2,3,4])
+	assert edges == set([(2,3,'b'),(3,4,'c')])
+
+def test_sentence_dependencyDistances():
+	text = 'lots of mutations cause dangerous cancer'
+	tokens = [ kindred.Token(w,None,None,0,0) for w in text.split() ]
+
+	s = kindred.Sentence(text,tokens,dependencies=[(2,0,'a'),(2,3,'b'),(3,3,'ROOT'),(3,5,'c'),(5,4,'d'),(-1,1,'e')])
+
+	distances = s.getDependencyDistances()
+	assert distances.dtype == 'int16'
+	assert distances.tolist() == [
+		[ 0,-1, 1, 2, 4, 3],
+		[-1, 0,-1,-1,-1,-1],
+		[ 1,-1, 0, 1, 3, 2],
+		[ 2,-1, 1, 0, 2, 1],
+		[ 4,-1, 3, 2, 0, 1],
+		[ 3,-1, 2, 1, 1, 0]]
+	assert s.getDependencyDistances() is distances
+
+	assert s.getDependencyDistances(maxSize=6*6*2-1) is None
+
+	s.dependencies = [(0,5,'f')]
+	assert s.getDependencyDistances()[0,5] == 1
+	assert s.getDependencyDistances()[0,2] == -1
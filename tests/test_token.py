@@ -9,3 +9,9 @@ def test_token_repr():
 	t = kindred.Token(word="hat",lemma="hat",partofspeech="NN",startPos=0,endPos=3)
 
 	assert t.__repr__()  == "hat"
+
+def test_token_noInstanceDict():
+	t = kindred.Token(word="hat",lemma="hat",partofspeech="NN",startPos=0,endPos=3)
+
+	assert not hasattr(t,'__dict__')
+	assert (t.word,t.lemma,t.partofspeech,t.startPos,t.endPos) == ("hat","hat","NN",0,3)
@@ -1,7 +1,9 @@
 import numpy as np
 import kindred
 import os
+import sys
 import json
+import functools
 
 from kindred.datageneration import generateData,generateTestData	
 
@@ -315,6 +317,80 @@ def test_vectorizer_defaults_triple():
 	assert matrix2.shape[0] == 60
 	assert len(matrix2.nonzero()) > 0
 
+def test_vectorizer_requiredAnnotations():
+	vectorizer = kindred.Vectorizer(featureChoice=['entityTypes','unigramsBetweenEntities'])
+	assert vectorizer.getRequiredAnnotations() == []
+
+	vectorizer = kindred.Vectorizer(featureChoice=['entityTypes','dependencyPathEdges'])
+	assert vectorizer.getRequiredAnnotations() == ['dependencies']
+
+	vectorizer = kindred.Vectorizer()
+	assert vectorizer.getRequiredAnnotations() == ['dependencies']
+
+def test_vectorizer_subgraphMemo():
+	text = '<drug id="1">Erlotinib</drug> is a common treatment for <cancer id="2">NSCLC</cancer>. <drug id="3">Aspirin</drug> is the main cause of <disease id="4">boneitis</disease> . <relation type="treats" subj="1" obj="2" />'
+
+	corpus = kindred.Corpus(text,loadFromSimpleTag=True)
+
+	parser = kindred.Parser()
+	parser.parse(corpus)
+
+	candidateBuilder = kindred.CandidateBuilder()
+	candidateRelations = candidateBuilder.build(corpus)
+	assert len(candidateRelations) == 4
+
+	vectorizer = kindred.Vectorizer(featureChoice=['dependencyPathEdges','dependencyPathEdgesNearEntities'])
+	vectors = vectorizer.fit_transform(candidateRelations)
+
+	# Each sentence has one pair of entities (in two orders) which both features use
+	assert vectorizer.subgraphMemoMisses == 2
+	assert vectorizer.subgraphMemoHits == 6
+
+	separateVectors = [ kindred.Vectorizer(featureChoice=[f]).fit_transform(candidateRelations) for f in vectorizer.chosenFeatures ]
+	assert vectors.toarray().tolist() == np.hstack([ v.toarray() for v in separateVectors ]).tolist()
+
+def test_vectorizer_subgraphMemoPerChunk(monkeypatch):
+	text = '<drug id="1">Erlotinib</drug> is a common treatment for <cancer id="2">NSCLC</cancer>. <drug id="3">Aspirin</drug> is the main cause of <disease id="4">boneitis</disease> . <relation type="treats" subj="1" obj="2" />'
+
+	corpus = kindred.Corpus(text,loadFromSimpleTag=True)
+	kindred.Parser().parse(corpus)
+
+	candidateBuilder = kindred.CandidateBuilder()
+	candidateRelations = candidateBuilder.build(corpus)
+	candidateTable = candidateBuilder.buildTable(corpus)
+
+	# Only one candidate relation in each chunk, so the subgraphs are only shared between the two features
+	vectorizerModule = sys.modules['kindred.Vectorizer']
+	monkeypatch.setattr(vectorizerModule,'_iterChunks',functools.partial(vectorizerModule._iterChunks,chunkSize=1))
+
+	vectorizer = kindred.Vectorizer(featureChoice=['dependencyPathEdges','dependencyPathEdgesNearEntities'])
+	tableVectors = vectorizer.fit_transform(candidateTable)
+	assert vectorizer.subgraphMemoMisses == 4
+	assert vectorizer.subgraphMemoHits == 4
+
+	listVectors = kindred.Vectorizer(featureChoice=['dependencyPathEdges','dependencyPathEdgesNearEntities']).fit_transform(candidateRelations)
+	assert (tableVectors != listVectors).nnz == 0
+
+def test_vectorizer_candidateTable():
+	corpus = generateData(positiveCount=50,negativeCount=50)
+
+	parser = kindred.Parser()
+	parser.parse(corpus)
+
+	candidateBuilder = kindred.CandidateBuilder()
+	candidateRelations = candidateBuilder.build(corpus)
+	candidateTable = candidateBuilder.buildTable(corpus)
+
+	vectorizer = kindred.Vectorizer()
+	listVectors = vectorizer.fit_transform(candidateRelations)
+
+	tableVectorizer = kindred.Vectorizer()
+	tableVectors = tableVectorizer.fit_transform(candidateTable)
+
+	assert tableVectorizer.getFeatureNames() == vectorizer.getFeatureNames()
+	assert (tableVectors != listVectors).nnz == 0
+	assert (tableVectorizer.transform(candidateTable) != vectorizer.transform(candidateRelations)).nnz == 0
+
 if __name__ == '__main__':
 	test_vectorizer_defaults_triple()
 
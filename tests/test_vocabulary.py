@@ -0,0 +1,34 @@
+import kindred
+import pickle
+
+def test_vocabulary_getID():
+	vocabulary = kindred.Vocabulary()
+
+	assert vocabulary.getID('cancer') == 0
+	assert vocabulary.getID('mutation') == 1
+	assert vocabulary.getID('cancer') == 0
+	assert len(vocabulary) == 2
+
+	assert vocabulary.getIDs(['mutation','gene','cancer']).tolist() == [1,2,0]
+	assert vocabulary.getString(2) == 'gene'
+	assert vocabulary.getStrings([0,1,2]) == ['cancer','mutation','gene']
+
+def test_vocabulary_pickle():
+	vocabulary = kindred.Vocabulary()
+	vocabulary.getIDs(['cancer','mutation','gene'])
+
+	unpickled = pickle.loads(pickle.dumps(vocabulary))
+	assert unpickled.strings == ['cancer','mutation','gene']
+	assert unpickled.getID('gene') == 2
+	assert unpickled.getID('drug') == 3
+
+def test_vocabulary_getLowercaseIDs():
+	vocabulary = kindred.Vocabulary()
+	ids = vocabulary.getIDs(['Cancer','cancer','BRCA1','the'])
+
+	lowercaseIDs = vocabulary.getLowercaseIDs(ids)
+	assert vocabulary.getStrings(lowercaseIDs) == ['cancer','cancer','brca1','the']
+	assert lowercaseIDs[0] == lowercaseIDs[1] == ids[1]
+
+	moreIDs = vocabulary.getIDs(['The','Gene'])
+	assert vocabulary.getStrings(vocabulary.getLowercaseIDs(moreIDs)) == ['the','gene']